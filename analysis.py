@@ -1,105 +1,252 @@
+import hashlib
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-import plotly.express as px
-from scipy.special import comb
+
+from dataset import HolidayDataset
+from dates import DAYS_IN_YEAR
+from plot_style import bar_labels, memoize_figure, template
+from profiling import instrument
+from streaming import DEFAULT_CHUNKSIZE, HolidayCounts, count_csv
+from windows import window_histogram, window_probabilities
 
 class BinomialDistribution:
     def __init__(self, n: int, p: float):
         self.n = n
         self.p = p
 
-    def pmf(self, k: int) -> float:
-        return comb(self.n, k) * self.p**k * (1 - self.p)**(self.n - k)
+    def logpmf(self, k):
+        """Log of the pmf, vectorized over k and stable for large n"""
+        from scipy.special import gammaln, xlog1py, xlogy
+        
+        k = np.asarray(k, dtype=float)
+        with np.errstate(invalid='ignore'):
+            log_comb = gammaln(self.n + 1) - gammaln(k + 1) - gammaln(self.n - k + 1)
+            result = log_comb + xlogy(k, self.p) + xlog1py(self.n - k, -self.p)
+        return np.where((k >= 0) & (k <= self.n), result, -np.inf)
+
+    def pmf(self, k):
+        return np.exp(self.logpmf(k))
+    
+    @property
+    def figure_key(self):
+        """Figures depend only on (n, p); None (uncached) for broadcast p"""
+        return (self.n, float(self.p)) if np.ndim(self.p) == 0 else None
     
+    @memoize_figure
     def plot_distribution(self, k: np.array = np.arange(1, 5)):
-        to_graph = [self.pmf(i)*365 for i in k]
-        fig = px.bar(x=k, y=to_graph, title="Independence/National Day Overlaps", labels={"x": "Overlap Size", "y": "Expected Number of Overlapping Days"},
-                     color_discrete_sequence=px.colors.qualitative.Set3)
+        import plotly.express as px
         
-        # Update layout for white background and emphasized axes
-        fig.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font={'color': 'black'},
-            margin=dict(l=60, r=30, t=60, b=60)
-        )
-        
-        # Update x-axis to show only integers and emphasize it
-        fig.update_xaxes(
-            tickmode='linear',
-            tick0=1,
-            dtick=1,
-            tickfont={'size': 12, 'color': 'black'},
-            title_font={'size': 14, 'color': 'black'},
-            zerolinecolor='black',
-            zerolinewidth=2,
-            showline=True,
-            linewidth=2,
-            linecolor='black',
-            showgrid=False
-        )
+        to_graph = self.pmf(k) * 365
+        # Axis styling comes from the house template
+        fig = px.bar(x=k, y=to_graph, title="Independence/National Day Overlaps", labels={"x": "Overlap Size", "y": "Expected Number of Overlapping Days"},
+                     color_discrete_sequence=px.colors.qualitative.Set3, template=template())
         
-        # Update y-axis to emphasize it
-        fig.update_yaxes(
-            tickfont={'size': 12, 'color': 'black'},
-            title_font={'size': 14, 'color': 'black'},
-            zerolinecolor='black',
-            zerolinewidth=2,
-            showline=True,
-            linewidth=2,
-            linecolor='black',
-            showgrid=False
-        )
+        # Show only integers on the x-axis
+        fig.update_xaxes(tickmode='linear', tick0=1, dtick=1)
         
-        # Add text annotations at the top of each bar
-        for i, (x_val, y_val) in enumerate(zip(k, to_graph)):
-            fig.add_annotation(
-                x=x_val,
-                y=y_val,
-                text=f'{round(y_val)}',
-                showarrow=False,
-                yshift=10,
-                font=dict(size=12, color='black')
-            )
+        # One text trace labels the top of every bar
+        fig.add_trace(bar_labels(k, to_graph, [round(y_val) for y_val in to_graph]))
         
         return fig
 
+def expected_window_overlaps(n: int, windows, k, days: int = DAYS_IN_YEAR) -> pd.DataFrame:
+    """
+    Expected number of days whose ±d window holds exactly k of `n` uniformly
+    placed holidays: each of the `days` windows covers 2d + 1 days, so its
+    count is Binomial(n, (2d + 1) / days). Laid out like `window_histogram`.
+    """
+    windows = np.atleast_1d(windows)
+    k = np.asarray(k)
+    p = window_probabilities(windows, days)
+    expected = BinomialDistribution(n, p[None, :]).pmf(k[:, None]) * days
+    return pd.DataFrame(expected, index=pd.Index(k, name='k'), columns=pd.Index(windows, name='window'))
+
+@lru_cache(maxsize=8)
+def _poisson_characteristic_grid(n: int, days: int):
+    """
+    Frequencies and the Poisson(n / days) characteristic function on them.
+    
+    The grid only covers the upper half-circle; the other half is the complex
+    conjugate. It does not depend on k, so it is shared by every k queried
+    for the same (n, days).
+    """
+    lam = n / days
+    # The inversion aliases totals modulo `length`, so it must exceed n by
+    # far more than the spread of the sums involved
+    length = n + int(15 * np.sqrt(n + 1)) + 64
+    index = np.arange(length // 2 + 1)
+    theta = 2 * np.pi * index / length
+    log_phi = lam * np.expm1(1j * theta)
+    # Hermitian weights: every frequency except 0 (and Nyquist) appears twice
+    weights = np.full(index.shape, 2.0)
+    weights[0] = 1.0
+    if length % 2 == 0:
+        weights[-1] = 1.0
+    return index, length, theta, np.exp(log_phi), weights
+
+
+class OccupancyDistribution:
+    """
+    Exact distribution of the number of days carrying exactly k of n holidays
+    when each holiday falls uniformly and independently on one of `days` days.
+    
+    Uses Poissonization: with each day's count drawn as Poisson(n / days) and
+    conditioned on the total being n, the counts are exactly multinomial, so
+    
+        P(N_k = j) = C(days, j) pi^j (1 - pi)^(days - j) P(S'_(days - j) = n - jk) / P(S = n)
+    
+    where pi is the Poisson pmf at k and S' is a sum of day counts conditioned
+    to differ from k. P(S' = t) comes from inverting its characteristic
+    function; frequencies whose contribution is below double precision are
+    skipped, which keeps n = 10**6 fast.
+    """
+    def __init__(self, n: int, days: int = 365):
+        self.n = n
+        self.days = days
+        self._distributions = {}
+
+    @property
+    def figure_key(self):
+        return (self.n, self.days)
+
+    def distribution(self, k: int) -> np.ndarray:
+        """P(exactly j days have exactly k holidays) for j = 0..days"""
+        k = int(k)
+        if k not in self._distributions:
+            self._distributions[k] = self._solve(k)
+        return self._distributions[k]
+
+    def _solve(self, k):
+        from scipy.special import gammaln, xlog1py, xlogy
+        
+        n, days = self.n, self.days
+        lam = n / days
+        log_pi = xlogy(k, lam) - lam - gammaln(k + 1)
+        pi = np.exp(log_pi)
+        j = np.arange(days + 1)
+        remaining = n - j * k
+        r = days - j
+        log_total = xlogy(n, n) - n - gammaln(n + 1)
+        log_weight = (gammaln(days + 1) - gammaln(j + 1) - gammaln(r + 1)
+                      + j * log_pi + xlog1py(r, -pi) - log_total)
+        # Only solve for j whose binomial weight is not vanishingly small
+        candidates = (remaining >= 0) & (log_weight > log_weight[remaining >= 0].max() - 60)
+
+        result = np.zeros(days + 1)
+        index, length, theta, phi, weights = _poisson_characteristic_grid(n, days)
+        # |phi_rest| <= (|phi| + pi) / (1 - pi): drop frequencies that cannot
+        # contribute for any candidate j before doing complex arithmetic
+        r_min = max(r[candidates].min(), 1)
+        with np.errstate(divide='ignore'):
+            live = r_min * np.log((np.abs(phi) + pi) / (1 - pi)) > -50
+            index, theta, phi, weights = index[live], theta[live], phi[live], weights[live]
+            log_phi_rest = np.log((phi - pi * np.exp(1j * k * theta)) / (1 - pi))
+        for jj in np.flatnonzero(candidates):
+            if r[jj] == 0:
+                density = float(remaining[jj] == 0)
+            else:
+                keep = r[jj] * log_phi_rest.real > -50
+                # Reduce the phase modulo the grid length in integer arithmetic
+                phase = (index[keep] * remaining[jj]) % length * (2 * np.pi / length)
+                terms = np.exp(r[jj] * log_phi_rest[keep] - 1j * phase)
+                density = (weights[keep] * terms.real).sum() / length
+            result[jj] = np.exp(log_weight[jj]) * max(density, 0.0)
+        return result / result.sum()
+
+    def mean(self, k=None) -> np.ndarray:
+        """Expected number of days with exactly k holidays (exact, by linearity)"""
+        k = np.arange(1, 6) if k is None else np.asarray(k)
+        return self.days * BinomialDistribution(self.n, 1 / self.days).pmf(k)
+
+    def percentiles(self, k=None, q=(2.5, 50, 97.5)) -> pd.DataFrame:
+        """Percentiles of the number of days with exactly k holidays (rows k, columns q)"""
+        k = np.arange(1, 6) if k is None else np.asarray(k)
+        cdf = np.array([np.cumsum(self.distribution(i)) for i in k])
+        # Tolerate rounding in the cumulative sums
+        values = {p: (cdf < p / 100 - 1e-12).sum(axis=1) for p in q}
+        return pd.DataFrame(values, index=pd.Index(k, name='k'))
+
 class EmpiricalOverlaps:
-    def __init__(self, path_to_data: str = "independence_and_national_days_updated.csv"):
+    def __init__(self, path_to_data: str = "independence_and_national_days_updated.csv", use_snapshot: bool = True,
+                 dataset: HolidayDataset = None, streaming: bool = False, chunksize: int = DEFAULT_CHUNKSIZE):
         self.path_to_data = path_to_data
+        self.use_snapshot = use_snapshot
+        # Streaming keeps only per-day counts, never the rows themselves
+        self.streaming = streaming
+        self.chunksize = chunksize
+        # A dataset passed in is shared by reference and never reloaded here
+        self._owns_dataset = dataset is None
+        self.dataset = dataset
         self.data = None
+        self.counts = None
         self.load_data()
         
     def load_data(self):
         """Load and parse the independence/national days data"""
-        self.data = pd.read_csv(self.path_to_data)
-        # Convert Display Date to datetime for analysis
-        self.data['date'] = pd.to_datetime(self.data['Display Date'], format='%d.%b', errors='coerce')
-        # Filter out rows where date parsing failed
-        self.data = self.data.dropna(subset=['date'])
+        if self.streaming and self._owns_dataset:
+            self.counts = count_csv(self.path_to_data, self.chunksize)
+            return
+        if self._owns_dataset:
+            self.dataset = HolidayDataset.load(self.path_to_data, self.use_snapshot)
+        # Rows where date parsing failed are left out
+        self.data = self.dataset.dated
+        self.counts = HolidayCounts.from_dataset(self.dataset)
+        
+    @property
+    def n(self) -> int:
+        """Number of celebrations with a known date"""
+        return int(self.counts.by_day.sum())
         
     def count_overlaps(self):
-        """Count the actual number of overlaps in the data"""
-        # Group by date and count occurrences
-        date_counts = self.data['date'].value_counts()
-        
-        # Count overlaps of different sizes
-        overlap_counts = {}
-        for size in range(1, 6):  # Check overlaps of size 1-5
-            count = len(date_counts[date_counts == size])
-            overlap_counts[size] = count
-            
-        return overlap_counts
+        """Count the actual number of overlaps in the data (days with exactly k celebrations, for every k >= 1)"""
+        return self.counts.overlap_counts()
+    
+    def window_overlaps(self, windows=range(0, 8)) -> pd.DataFrame:
+        """Days whose ±d window holds exactly k celebrations, by k and half-width d (wrapping Dec→Jan)"""
+        return window_histogram(self.counts.by_day, windows)
+    
+    def expected_window_overlaps(self, windows=range(0, 8)) -> pd.DataFrame:
+        """`window_overlaps` expected under uniformly random dates, on the same k index"""
+        empirical = self.window_overlaps(windows)
+        return expected_window_overlaps(self.n, windows, empirical.index, days=len(self.counts.by_day))
+    
+    @property
+    def figure_key(self) -> str:
+        """The dataset version, or a digest of the per-day counts when streaming"""
+        if self.dataset is not None:
+            return self.dataset.version
+        return hashlib.sha256(self.counts.counts.tobytes()).hexdigest()[:16]
     
-    def plot_combined_distribution(self, binomial_dist):
-        """Create a combined plot showing both expected and empirical overlaps"""
+    @memoize_figure
+    def plot_combined_distribution(self, binomial_dist, bands=None):
+        """
+        Create a combined plot showing both expected and empirical overlaps.
+        
+        If `bands` is given (e.g. a `MonteCarloOverlaps`), the expected bars
+        get error bars spanning its 2.5th to 97.5th percentiles. Bands with a
+        `max_k` count days with `max_k` or more celebrations in their last
+        bin, so bars from `max_k` up are folded into one "≥ max_k" bar.
+        """
+        import plotly.express as px
+        
         # Get empirical counts
         empirical_counts = self.count_overlaps()
         k_values = list(empirical_counts.keys())
         empirical_values = list(empirical_counts.values())
         
         # Get expected values from binomial distribution
-        expected_values = [round(binomial_dist.pmf(i) * 365) for i in k_values]
+        expected = binomial_dist.pmf(k_values) * 365
+        cap = getattr(bands, 'max_k', None)
+        capped = cap is not None and bool(k_values) and max(k_values) >= cap
+        if capped:
+            below = [k < cap for k in k_values]
+            empirical_values = [v for v, keep in zip(empirical_values, below) if keep] + \
+                               [sum(v for v, keep in zip(empirical_values, below) if not keep)]
+            expected = np.append(expected[below], 365 * (1 - binomial_dist.pmf(np.arange(cap)).sum()))
+            k_values = [k for k in k_values if k < cap] + [cap]
+        expected_values = np.round(expected).astype(int).tolist()
         
         # Create the plot
         fig = px.bar(
@@ -108,15 +255,12 @@ class EmpiricalOverlaps:
             title="Independence/National Day Overlaps: Expected vs Empirical",
             labels={"x": "Overlap Size", "y": "Number of Overlapping Days", "variable": "Type"},
             barmode='group',
-            color_discrete_sequence=[px.colors.qualitative.Set2[0], '#ff7f0e']  # Keep first Set2 color, use orange for second
+            color_discrete_sequence=[px.colors.qualitative.Set2[0], '#ff7f0e'],  # Keep first Set2 color, use orange for second
+            template=template()
         )
         
-        # Update layout for white background and emphasized axes
+        # Axis styling comes from the house template
         fig.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font={'color': 'black'},
-            margin=dict(l=60, r=30, t=60, b=60),
             legend=dict(
                 title="Data Type",
                 x=0.98,
@@ -128,64 +272,47 @@ class EmpiricalOverlaps:
                 borderwidth=1
             )
         )
-        
-        # Update x-axis
-        fig.update_xaxes(
-            tickmode='linear',
-            tick0=1,
-            dtick=1,
-            tickfont={'size': 12, 'color': 'black'},
-            title_font={'size': 14, 'color': 'black'},
-            zerolinecolor='black',
-            zerolinewidth=2,
-            showline=True,
-            linewidth=2,
-            linecolor='black',
-            showgrid=False
-        )
-        
-        # Update y-axis
-        fig.update_yaxes(
-            tickfont={'size': 12, 'color': 'black'},
-            title_font={'size': 14, 'color': 'black'},
-            zerolinecolor='black',
-            zerolinewidth=2,
-            showline=True,
-            linewidth=2,
-            linecolor='black',
-            title = "Number of Overlapping Days",
-            showgrid=False
-        )
+        if capped:
+            fig.update_xaxes(tickmode='array', tickvals=k_values,
+                             ticktext=[str(k) for k in k_values[:-1]] + [f"≥{cap}"])
+        else:
+            fig.update_xaxes(tickmode='linear', tick0=1, dtick=1)
+        fig.update_yaxes(title="Number of Overlapping Days")
         
         # Update legend labels
         fig.data[0].name = "Empirical (Actual)"
         fig.data[1].name = "Expected (Binomial)"
         
-        # Add value labels on bars with proper positioning for grouped bars
-        for i, trace in enumerate(fig.data):
-            for j, (x_val, y_val) in enumerate(zip(k_values, [empirical_values, expected_values][i])):
-                # Calculate proper x offset for grouped bars
-                x_offset = (i - 0.5) * 0.4  # Center each bar in its group
-                fig.add_annotation(
-                    x=x_val + x_offset,
-                    y=y_val,
-                    text=f'{y_val}',
-                    showarrow=False,
-                    yshift=10,
-                    font=dict(size=10, color='black')
-                )
+        # Add the simulated 95% band around the expected counts
+        label_heights = [empirical_values, expected_values]
+        if bands is not None:
+            band = bands.percentiles(k_values, q=(2.5, 97.5))
+            lower, upper = band[2.5].to_numpy(), band[97.5].to_numpy()
+            fig.data[1].error_y = dict(
+                type='data',
+                symmetric=False,
+                array=np.maximum(upper - expected_values, 0),
+                arrayminus=np.maximum(expected_values - lower, 0),
+                color='black',
+                thickness=1.5,
+                width=4
+            )
+            fig.data[1].name = "Expected (Binomial, 95% simulated band)"
+            label_heights[1] = np.maximum(upper, expected_values)
+        
+        # Label the bars with one text trace per group, centred over each bar of the pair
+        for i, values in enumerate([empirical_values, expected_values]):
+            x_offset = (i - 0.5) * 0.4
+            fig.add_trace(bar_labels(np.add(k_values, x_offset), label_heights[i], values, size=10))
         
         return fig
 
+for _cls in (BinomialDistribution, OccupancyDistribution, EmpiricalOverlaps):
+    instrument(_cls)
+
 if __name__ == "__main__":
-    # # Create theoretical binomial distribution
-    # binomial = BinomialDistribution(n=201, p=1/365)
-    # fig_theoretical = binomial.plot_distribution()
-    # fig_theoretical.write_image("independence_national_day_overlaps_theoretical.png", scale = 2)
-    
-    # # Create empirical analysis and combined plot
-    # empirical = EmpiricalOverlaps()
-    # fig_combined = empirical.plot_combined_distribution(binomial)
-    # fig_combined.write_image("independence_national_day_overlaps_with_empirical.png", scale = 2)
-    fig = EmpiricalOverlaps().plot_combined_distribution(BinomialDistribution(n=201, p=1/365))
-    fig.write_image("independence_national_day_overlaps_with_empirical.png", scale = 2)
\ No newline at end of file
+    # The overlap distribution against the data, through the command-line entry point (see cli.py)
+    import sys
+
+    from cli import main
+    sys.exit(main(["figure", "independence_national_day_overlaps_with_empirical", *sys.argv[1:]]))
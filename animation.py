@@ -0,0 +1,118 @@
+"""
+Animated "who is celebrating today" timeline over the year.
+
+`px.choropleth(animation_frame=...)` would repeat every location, color and
+hover text in each of the 366 frames. `CelebrationTimeline` instead builds
+two traces:
+
+* a base trace with every country's location and name, sent once, and
+* a highlight trace drawn on top of it, which is the only thing frames update.
+
+A frame carries just the countries celebrating on its day (the ones whose
+state differs from the base map), so its size follows the day's celebrations
+rather than the number of countries, and every frame is still complete on its
+own: jumping the slider to any day shows the right map. The per-day country
+lists come from one sort of (day, country) codes, with no per-frame filtering
+of the table.
+"""
+import numpy as np
+import pandas as pd
+
+from dates import DAYS_IN_YEAR, MONTH_BY_DAY, MONTH_ABBREVIATIONS, UNKNOWN_DAY, display_date
+from plot_style import template
+
+BASE_COLOR = '#bdbdbd'
+HIGHLIGHT_COLOR = '#C44E52'
+FRAME_DURATION = 150          # milliseconds per day when playing
+MAX_TITLE_NAMES = 4
+
+
+def _flat_scale(color: str) -> list:
+    return [[0, color], [1, color]]
+
+
+class CelebrationTimeline:
+    """Per-day celebrating countries of a `HolidayDataset`, and the animated map built from them"""
+    def __init__(self, dataset):
+        iso = dataset.ISO_3
+        codes = iso.cat.codes.to_numpy().astype(np.int64)
+        day = dataset.day_of_year.to_numpy().astype(np.int64)
+        located = codes >= 0
+
+        # Every located country, once, named after its first row
+        names = pd.Series(dataset.table['Country'].to_numpy()[located]).groupby(codes[located]).first()
+        self.locations = iso.cat.categories[names.index].to_numpy(dtype=object)
+        self.names = names.to_numpy(dtype=object)
+        position = np.full(len(iso.cat.categories), -1, dtype=np.int64)
+        position[names.index] = np.arange(len(names))
+
+        # (day, country) pairs, deduplicated and sorted by day: aliases of one
+        # country on the same day collapse, and each day's countries are a slice
+        dated = located & (day != UNKNOWN_DAY)
+        pairs = np.unique(day[dated] * len(names) + position[codes[dated]])
+        self._countries = pairs % len(names)
+        self._starts = np.searchsorted(pairs // len(names), np.arange(DAYS_IN_YEAR + 2))
+
+    def countries_on(self, day: int) -> np.ndarray:
+        """Positions (into `locations` / `names`) of the countries celebrating on a day-of-year"""
+        return self._countries[self._starts[day]:self._starts[day + 1]]
+
+    def _title(self, day: int, names) -> str:
+        shown = ", ".join(names[:MAX_TITLE_NAMES])
+        if len(names) > MAX_TITLE_NAMES:
+            shown += f" and {len(names) - MAX_TITLE_NAMES} more"
+        return f"{display_date(day)}: {shown or 'no independence or national day'}"
+
+    def _highlight(self, day: int) -> dict:
+        """Data of the highlight trace on a day: only that day's countries"""
+        today = self.countries_on(day)
+        return dict(locations=self.locations[today].tolist(), text=self.names[today].tolist(),
+                    z=[1] * len(today))
+
+    def frames(self) -> list:
+        """One frame per day of the (leap) year, updating only the highlight trace and the title"""
+        frames = []
+        for day in range(1, DAYS_IN_YEAR + 1):
+            highlight = self._highlight(day)
+            frames.append(dict(name=str(day), traces=[1], data=[dict(type='choropleth', **highlight)],
+                               layout=dict(title=dict(text=self._title(day, highlight['text'])))))
+        return frames
+
+    def _slider(self) -> dict:
+        # Only the first day of each month is labelled; the title names the current day
+        jump = dict(mode='immediate', frame=dict(duration=0, redraw=True), transition=dict(duration=0))
+        steps = [dict(method='animate', args=[[str(day)], jump],
+                      label=MONTH_ABBREVIATIONS[MONTH_BY_DAY[day] - 1] if MONTH_BY_DAY[day] != MONTH_BY_DAY[day - 1]
+                      else '')
+                 for day in range(1, DAYS_IN_YEAR + 1)]
+        return dict(steps=steps, active=0, currentvalue=dict(visible=False), ticklen=0, minorticklen=0,
+                    len=0.9, x=0.1, y=0, pad=dict(t=10))
+
+    def _buttons(self, frame_duration: int) -> dict:
+        play = dict(frame=dict(duration=frame_duration, redraw=True), transition=dict(duration=0), fromcurrent=True)
+        pause = dict(mode='immediate', frame=dict(duration=0, redraw=False), transition=dict(duration=0))
+        return dict(type='buttons', direction='left', x=0.1, y=0, xanchor='right', yanchor='top',
+                    pad=dict(t=10, r=10), showactive=False,
+                    buttons=[dict(label='▶', method='animate', args=[None, play]),
+                             dict(label='❚❚', method='animate', args=[[None], pause])])
+
+    def figure(self, frame_duration: int = FRAME_DURATION):
+        """The animated map: base and highlight traces, 366 frames, a day slider and play/pause buttons"""
+        import plotly.graph_objects as go
+
+        first = self._highlight(1)
+        base = go.Choropleth(locations=self.locations, text=self.names, z=np.zeros(len(self.locations)),
+                             colorscale=_flat_scale(BASE_COLOR), zmin=0, zmax=1, showscale=False,
+                             marker_line_color='white', marker_line_width=0.5, hoverinfo='text', name='')
+        highlight = go.Choropleth(**first, colorscale=_flat_scale(HIGHLIGHT_COLOR), zmin=0, zmax=1,
+                                  showscale=False, marker_line_color='white', marker_line_width=0.5,
+                                  hoverinfo='text', name='')
+        fig = go.Figure(data=[base, highlight], frames=self.frames())
+        fig.update_layout(
+            template=template(),
+            title=dict(text=self._title(1, first['text']), font_size=18),
+            margin=dict(l=10, r=10, t=60, b=60),
+            sliders=[self._slider()],
+            updatemenus=[self._buttons(frame_duration)],
+        )
+        return fig
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check.
+
+Runs each scenario in a fresh interpreter with `python -X importtime`, sums
+the cumulative time of the top-level imports, and compares it (and the set of
+modules pulled in) against `import_budget.json`:
+
+    python benchmarks/import_time.py            # check against the budget
+    python benchmarks/import_time.py --update   # record the current timings
+
+A scenario fails if it exceeds its time budget or imports any of its
+forbidden packages (e.g. plotly for a stats-only run).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "import_budget.json"
+
+SCENARIOS = {
+    "season_stats": "from visualization import Choropleth; Choropleth().get_season_stats()",
+    "count_overlaps": "from analysis import EmpiricalOverlaps; EmpiricalOverlaps().count_overlaps()",
+}
+# Heavy stacks that stats-only scenarios must not load
+FORBIDDEN = ["plotly", "scipy", "geopandas", "shapely", "kaleido", "choreographer"]
+# Headroom applied to measured timings when recording a budget
+HEADROOM = 1.5
+
+
+def parse_importtime(stderr: str):
+    """Total top-level import time in ms and the set of top-level packages imported"""
+    total_us = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        packages.add(name.strip().split(".")[0])
+        # Nested imports are indented further; only count the outermost ones
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, packages
+
+
+def measure(code: str, repeat: int = 3):
+    """Median import time (ms) of `code` in fresh interpreters and the packages it imports"""
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        total_ms, packages = parse_importtime(result.stderr)
+        timings.append(total_ms)
+    return statistics.median(timings), packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import times against the recorded budget")
+    parser.add_argument("--update", action="store_true", help="record current timings as the new budget")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    failures = []
+    for name, code in SCENARIOS.items():
+        total_ms, packages = measure(code, args.repeat)
+        recorded = budget.get(name, {})
+        loaded = sorted(p for p in recorded.get("forbidden", FORBIDDEN) if p in packages)
+        limit = recorded.get("max_import_ms")
+        status = "ok"
+        if loaded:
+            status = f"imports {', '.join(loaded)}"
+            failures.append(name)
+        elif limit is not None and total_ms > limit and not args.update:
+            status = f"over budget ({limit:.0f} ms)"
+            failures.append(name)
+        print(f"{name:<16} {total_ms:8.1f} ms  {status}")
+        if args.update:
+            budget[name] = {"max_import_ms": round(total_ms * HEADROOM), "forbidden": FORBIDDEN}
+
+    if args.update:
+        BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n")
+        print(f"✓ Recorded budget in {BUDGET_FILE.name}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
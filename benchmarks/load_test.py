@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency of `server.py` under concurrent keep-alive clients.
+
+    python benchmarks/load_test.py                          # starts a server on a free port
+    python benchmarks/load_test.py --url http://127.0.0.1:8050 --connections 64 --duration 10
+
+Each connection sends GETs back to back for `--duration` seconds, cycling
+through the paths (stats and lookups by default). Reports requests per
+second and latency percentiles per path and overall.
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATHS = ["/stats", "/stats/seasons", "/stats/hemispheres", "/stats/months", "/stats/overlaps",
+                 "/dates/04.Jul", "/countries/France", "/health"]
+
+
+async def _get(reader, writer, host: str, path: str) -> int:
+    """Send one keep-alive GET and read the full response; returns the status"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+        elif line.lower() == b"transfer-encoding: chunked":
+            length = None
+    if length is None:
+        # Chunked (streamed calendar feeds): read chunks up to the empty last one
+        while length != 0:
+            length = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+            await reader.readexactly(length + 2)
+    else:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(host: str, port: int, paths, offset: int, deadline: float, latencies: dict, errors: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            status = await _get(reader, writer, host, path)
+            latencies[path].append(time.perf_counter() - start)
+            if status != 200:
+                errors.append((path, status))
+            i += 1
+    finally:
+        writer.close()
+
+
+async def load(host: str, port: int, paths, connections: int, duration: float):
+    latencies = {path: [] for path in paths}
+    errors = []
+    # Warm the server's cache for every path before timing
+    reader, writer = await asyncio.open_connection(host, port)
+    for path in paths:
+        await _get(reader, writer, host, path)
+    writer.close()
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_client(host, port, paths, i, deadline, latencies, errors) for i in range(connections)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _percentiles(samples):
+    cut = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    return statistics.median(samples), cut[98]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    """Run server.py in a subprocess and wait until it accepts connections"""
+    process = subprocess.Popen([sys.executable, "server.py", "--port", str(port)], cwd=ROOT,
+                               stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        print(line, end="")
+        if line.startswith("✓ Serving"):
+            return process
+    raise RuntimeError(f"server exited with status {process.wait()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the HTTP service")
+    parser.add_argument("--url", help="running server to test (default: start one on a free port)")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds")
+    parser.add_argument("--paths", nargs="*", default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        process = _start_server(port)
+    try:
+        latencies, errors, elapsed = asyncio.run(load(host, port, args.paths, args.connections, args.duration))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"\n{total} requests over {args.connections} connections in {elapsed:.1f} s: "
+          f"{total / elapsed:,.0f} req/s, {len(errors)} non-200")
+    print(f"{'path':<24} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for path, samples in [*latencies.items(), ("all", [s for samples in latencies.values() for s in samples])]:
+        if samples:
+            p50, p99 = _percentiles(samples)
+            print(f"{path:<24} {len(samples):>9} {p50 * 1000:>8.3f} {p99 * 1000:>8.3f}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for loading, processing, overlap counting and rendering.
+
+Every case runs against the real CSV and against synthetic tables of
+increasing size (see `synthetic.py`). The fastest of several timed runs is
+compared to `baselines.json` (the median is printed alongside it):
+
+    python benchmarks/run.py                         # compare against the baselines
+    python benchmarks/run.py --update --rounds 3     # record the current timings
+    python benchmarks/run.py --sizes 1000 10000000   # choose synthetic sizes
+    python benchmarks/run.py --cases count_overlaps  # run a subset of the cases
+
+A case fails if its fastest run exceeds the baseline by more than `--tolerance`
+(and by more than a millisecond, so microsecond cases don't flap). With
+`--rounds`, the suite is run several times over; a check takes the fastest
+run of any pass, and `--update` records the slowest pass's fastest run, so a
+fresh baseline holds up against the ordinary noise of a shared machine.
+Cases that cannot run here (e.g. image export without Chrome) are reported
+as skipped.
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dataset import DEFAULT_PATH, HolidayDataset  # noqa: E402
+from synthetic import synthetic_csv  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Largest table each kind of case is run against; plotly figures embed every
+# row, so building them beyond this measures JSON serialization, not our code
+MAX_ROWS_PROCESSING = 10_000_000
+MAX_ROWS_FIGURES = 100_000
+MAX_ROWS_RENDER = 1_000
+# Slowdowns smaller than this are timer noise, whatever the ratio
+NOISE_FLOOR = 0.001
+
+
+class Skip(Exception):
+    """Raised by a case that cannot run in this environment"""
+
+
+def _choropleth(path, use_snapshot=True):
+    from visualization import Choropleth
+    return Choropleth(dataset=HolidayDataset.from_csv(path, use_snapshot=use_snapshot))
+
+
+def _overlaps(path):
+    from analysis import EmpiricalOverlaps
+    return EmpiricalOverlaps(dataset=HolidayDataset.from_csv(path))
+
+
+def _stream_counts(path):
+    from streaming import count_csv
+    return count_csv(path)
+
+
+def _binomial(_):
+    from analysis import BinomialDistribution
+    return BinomialDistribution(n=201, p=1/365)
+
+
+def _plot_binomial(binomial):
+    from plot_style import clear_figure_cache
+    clear_figure_cache()
+    binomial.plot_distribution()
+
+
+def _permutation_setup(path):
+    dataset = HolidayDataset.from_csv(path)
+    return dataset.hemisphere_code, dataset.day_of_year.to_numpy()
+
+
+def _permutation_tests(codes):
+    from simulation import PermutationTests
+    PermutationTests(permutations=100_000, workers=1).all(*codes)
+
+
+def _publish_snapshot(path):
+    HolidayDataset.from_csv(path)               # writes the snapshot if it is missing
+    return path
+
+
+def _figure(name):
+    """Case that builds one of the CLI's figures from a prepared report"""
+    def setup(path):
+        from cli import Report
+        report = Report(HolidayDataset.from_csv(path))
+        report.choropleth, report.overlaps      # build the shared objects outside the timing
+        return report
+
+    def run(report):
+        from cli import FIGURES
+        from plot_style import clear_figure_cache
+        clear_figure_cache()                    # time the build, not a memoized hit
+        FIGURES[name](report)
+    return MAX_ROWS_FIGURES, setup, run
+
+
+def _figure_hit(report):
+    from cli import FIGURES
+    FIGURES["choropleth_map"](report)
+
+
+def _render_setup(path):
+    from render import RenderService
+    service = RenderService(cache_dir=None)
+    fig = _choropleth(path).histogram_by_month()
+    try:
+        service.to_image(fig)                   # start the browser outside the timing
+    except Exception as error:
+        raise Skip(f"{type(error).__name__}: {str(error).split('.')[0]}")
+    return service, fig
+
+
+# Case name ➜ (largest table size, setup(path) -> state, run(state))
+CASES = {
+    # Parse the CSV and derive every column, from scratch and from a snapshot
+    "choropleth_init": (MAX_ROWS_PROCESSING, lambda path: path, lambda path: _choropleth(path, use_snapshot=False)),
+    "choropleth_init_snapshot": (MAX_ROWS_PROCESSING, _publish_snapshot, _choropleth),
+    # A fresh dataset per run, so load_data parses instead of reusing a loaded one
+    "overlaps_load_data": (MAX_ROWS_PROCESSING, lambda path: path, _overlaps),
+    "count_overlaps": (MAX_ROWS_PROCESSING, _overlaps, lambda overlaps: overlaps.count_overlaps()),
+    "window_overlaps": (MAX_ROWS_PROCESSING, _overlaps, lambda overlaps: overlaps.window_overlaps(range(0, 31))),
+    "stream_counts": (MAX_ROWS_PROCESSING, lambda path: path, _stream_counts),
+    # Independent of the table; run once, against the smallest tables
+    "binomial_plot_distribution": (MAX_ROWS_RENDER, _binomial, _plot_binomial),
+    "render_write_image": (MAX_ROWS_RENDER, _render_setup, lambda state: state[0].to_image(state[1])),
+    # 10^5 permutations of each significance test, on one worker
+    "permutation_tests": (MAX_ROWS_RENDER, _permutation_setup, _permutation_tests),
+}
+for _name in ["choropleth_map", "histogram_by_month", "bar_graph_season_counts", "hemisphere_season_analysis",
+              "independence_national_day_overlaps_theoretical", "independence_national_day_overlaps_with_empirical"]:
+    CASES[f"figure_{_name}"] = _figure(_name)
+# A repeated request for an already-built figure
+CASES["figure_memoized_hit"] = (MAX_ROWS_FIGURES, _figure("choropleth_map")[1], _figure_hit)
+
+
+def time_case(setup, run, path, repeat: int):
+    """Median and minimum wall-clock seconds of `run` over `repeat` runs (after one warm-up)
+
+    Like `timeit`, the garbage collector is paused while timing so a collection
+    triggered by an earlier case isn't billed to this one.
+    """
+    state = setup(path)
+    run(state)
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return statistics.median(timings), min(timings)
+
+
+def datasets(sizes, seed):
+    """(label, row count, CSV path) for the real CSV and each synthetic size"""
+    real = ROOT / DEFAULT_PATH
+    yield "real", len(HolidayDataset.from_csv(real)), real
+    for rows in sizes:
+        yield str(rows), rows, synthetic_csv(rows, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the pipeline on real and synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES, help="synthetic row counts")
+    parser.add_argument("--cases", nargs="*", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the whole suite")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown over the baseline")
+    parser.add_argument("--update", action="store_true", help="record current timings as the new baselines")
+    args = parser.parse_args()
+
+    # Passes are interleaved so a slow spell on the machine hits every case a little
+    results = {}
+    for _ in range(args.rounds):
+        for label, rows, path in datasets(args.sizes, args.seed):
+            for name in args.cases:
+                max_rows, setup, run = CASES[name]
+                if rows > max_rows:
+                    continue
+                try:
+                    timing = time_case(setup, run, path, args.repeat)
+                except Skip as reason:
+                    results[name, label] = reason
+                    continue
+                results.setdefault((name, label), []).append(timing)
+
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    failures = []
+    for (name, label), timings in results.items():
+        if isinstance(timings, Skip):
+            print(f"{name:<58} {label:>9}  skipped ({timings})")
+            continue
+        # The minimum is the least noisy estimate; the median drifts with machine load
+        median = statistics.median(m for m, _ in timings)
+        best = min(b for _, b in timings)
+        recorded = baselines.get(name, {}).get(label)
+        status = ""
+        if recorded is not None:
+            ratio = best / recorded
+            status = f"{ratio:5.2f}x baseline"
+            slower = ratio > 1 + args.tolerance and best - recorded > NOISE_FLOOR
+            if slower and not args.update:
+                status += "  REGRESSION"
+                failures.append((name, label))
+        print(f"{name:<58} {label:>9}  {best * 1000:10.2f} ms (median {median * 1000:.2f})  {status}")
+        if args.update:
+            # Record the slowest pass's minimum, so the baseline covers the spread
+            # between passes rather than the single luckiest run
+            baselines.setdefault(name, {})[label] = round(max(b for _, b in timings), 6)
+
+    if args.update:
+        BASELINE_FILE.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"✓ Recorded baselines in {BASELINE_FILE.name}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
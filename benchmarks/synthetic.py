@@ -0,0 +1,63 @@
+"""
+Synthetic holiday tables in the schema of the updated CSV, at any size.
+
+Rows draw their ISO code from `data/countries.csv` and their display date
+uniformly from the (leap-year) calendar, so every stage downstream of the CSV
+(ISO lookups, hemispheres, seasons, overlap counts) sees realistic values.
+A small fraction of rows gets an unparseable display date, as scraped data
+sometimes does. Generated files are cached under `benchmarks/data/`.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from countries import COUNTRY_TABLE
+from dates import DAYS_IN_MONTH, DAYS_IN_YEAR, MONTH_ABBREVIATIONS
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+UNPARSEABLE_FRACTION = 0.01
+
+
+def _display_date_labels() -> np.ndarray:
+    """"DD.Mon" label for each day-of-year, with an unparseable label in slot 0"""
+    labels = [f"{day:02d}.{month}"
+              for month, days in zip(MONTH_ABBREVIATIONS, DAYS_IN_MONTH)
+              for day in range(1, days + 1)]
+    return np.array(["Unknown"] + labels, dtype=object)
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A frame with the updated CSV's columns and `rows` random rows"""
+    rng = np.random.default_rng(seed)
+    countries = pd.read_csv(COUNTRY_TABLE)
+    picked = rng.integers(len(countries), size=rows)
+    iso_numeric = countries['iso_numeric'].to_numpy()[picked]
+    alpha3 = countries['iso_alpha3'].to_numpy()[picked]
+
+    day = rng.integers(1, DAYS_IN_YEAR + 1, size=rows)
+    day[rng.random(rows) < UNPARSEABLE_FRACTION] = 0
+    display_date = _display_date_labels()[day]
+
+    has_independence = rng.random(rows) < 0.85
+    has_national = ~has_independence | (rng.random(rows) < 0.95)
+    return pd.DataFrame({
+        'Country': alpha3,
+        'has_independence_day': has_independence,
+        'Independence day date': np.where(has_independence, display_date, None),
+        'has_national_day': has_national,
+        'National day date': np.where(has_national, display_date, None),
+        'ISO Code': pd.Series(iso_numeric).map('{:03d}'.format),
+        'Display Date': display_date,
+    })
+
+
+def synthetic_csv(rows: int, seed: int = 0, directory=DATA_DIR) -> Path:
+    """Path to a synthetic CSV with `rows` rows, generated on first use"""
+    path = Path(directory) / f"synthetic_{rows}_{seed}.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".csv.tmp")
+        synthetic_frame(rows, seed).to_csv(partial, index=False)
+        partial.replace(path)
+    return path
@@ -0,0 +1,109 @@
+"""
+Year-less holidays expanded onto concrete calendars.
+
+Each row's day-of-year (leap-year calendar, see `dates`) is mapped onto every
+year of a span, giving a (row x year) grid of dates and weekdays. Everything
+is computed by broadcasting a per-row offset against per-year constants, so
+tens of millions of cells cost one pass of integer arithmetic; concrete
+`datetime64` dates are only materialized on request.
+
+29 February has no date in common years. `leap_day` picks what happens then:
+"feb28" and "mar1" observe the holiday on the neighbouring day, "skip" leaves
+the cell empty (NaT, weekday -1).
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from dates import UNKNOWN_DAY
+
+DEFAULT_YEARS = range(1900, 2101)
+LEAP_DAY = 60
+LEAP_DAY_POLICIES = ("feb28", "mar1", "skip")
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+WEEKEND = (5, 6)
+# 1970-01-01, day 0 of datetime64[D], was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def is_leap(years) -> np.ndarray:
+    years = np.asarray(years)
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+class CalendarExpansion:
+    def __init__(self, day_of_year, years=DEFAULT_YEARS, leap_day: str = "feb28", index=None):
+        if leap_day not in LEAP_DAY_POLICIES:
+            raise ValueError(f"leap_day must be one of {LEAP_DAY_POLICIES}, got {leap_day!r}")
+        self.day_of_year = np.asarray(day_of_year, dtype=np.int64)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.leap_day = leap_day
+        self.index = pd.RangeIndex(len(self.day_of_year)) if index is None else index
+
+    @classmethod
+    def from_dataset(cls, dataset, years=DEFAULT_YEARS, leap_day: str = "feb28"):
+        """Expand every row of a `HolidayDataset`, keeping its row labels"""
+        return cls(dataset.day_of_year.to_numpy(), years, leap_day, index=dataset.table.index)
+
+    @cached_property
+    def _cells(self):
+        """Days since 1970-01-01 for each cell (int32) and a mask of cells with a date"""
+        day = self.day_of_year[:, None]
+        common_year = ~is_leap(self.years)[None, :]
+        year_start = (self.years - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64)
+        # Leap-calendar days after 29 February are one day earlier in a common year
+        shift = (day > LEAP_DAY) & common_year
+        offset = day - 1 - shift
+        on_leap_day = (day == LEAP_DAY) & common_year
+        if self.leap_day == "feb28":
+            offset = offset - on_leap_day
+        valid = (day != UNKNOWN_DAY) & ~(on_leap_day & (self.leap_day == "skip"))
+        valid = np.broadcast_to(valid, offset.shape)
+        return (year_start[None, :] + offset).astype(np.int32), valid
+
+    @cached_property
+    def dates(self) -> np.ndarray:
+        """datetime64[D] date of each (row, year) cell, NaT where there is none"""
+        days, valid = self._cells
+        return np.where(valid, days.astype('datetime64[D]'), np.datetime64('NaT', 'D'))
+
+    @cached_property
+    def weekdays(self) -> np.ndarray:
+        """Weekday of each cell (0 = Monday ... 6 = Sunday), -1 where there is no date"""
+        days, valid = self._cells
+        weekdays = ((days + _EPOCH_WEEKDAY) % 7).astype(np.int8)
+        weekdays[~valid] = -1
+        return weekdays
+
+    def weekday_counts(self) -> pd.DataFrame:
+        """Years each row falls on each weekday"""
+        rows = len(self.day_of_year)
+        # Offset each row's weekdays so one bincount counts every row; -1 goes to an 8th column
+        flat = np.where(self.weekdays >= 0, self.weekdays, 7) + 8 * np.arange(rows)[:, None]
+        counts = np.bincount(flat.ravel(), minlength=8 * rows).reshape(rows, 8)[:, :7]
+        return pd.DataFrame(counts, index=self.index, columns=WEEKDAYS)
+
+    def weekend_share(self, weekend=WEEKEND) -> pd.Series:
+        """Fraction of years (with a date) on which each row falls on a weekend, NaN if it never has a date"""
+        counts = self.weekday_counts()
+        observed = counts.sum(axis=1)
+        weekend_counts = counts.iloc[:, list(weekend)].sum(axis=1)
+        return (weekend_counts / observed.where(observed > 0)).rename('weekend_share')
+
+    def weekday_by_year(self) -> pd.DataFrame:
+        """Rows falling on each weekday, per year"""
+        years = len(self.years)
+        flat = np.where(self.weekdays >= 0, self.weekdays, 7) + 8 * np.arange(years)[None, :]
+        counts = np.bincount(flat.ravel(), minlength=8 * years).reshape(years, 8)[:, :7]
+        return pd.DataFrame(counts, index=pd.Index(self.years, name='year'), columns=WEEKDAYS)
+
+    def weekend_by_year(self, weekend=WEEKEND) -> pd.Series:
+        """Rows falling on a weekend, per year"""
+        return self.weekday_by_year().iloc[:, list(weekend)].sum(axis=1).rename('weekend')
+
+    def same_weekday_collisions(self) -> pd.Series:
+        """Pairs of rows whose holidays fall on the same weekday, per year"""
+        counts = self.weekday_by_year().to_numpy()
+        return pd.Series((counts * (counts - 1) // 2).sum(axis=1), index=pd.Index(self.years, name='year'),
+                         name='same_weekday_pairs')
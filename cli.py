@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for the statistics and figures.
+
+    python cli.py stats                                # season/hemisphere/overlap statistics
+    python cli.py figure choropleth_map -o images      # build and export one figure
+    python cli.py build-all -o images --workers 4      # every figure and statistic
+
+The data is loaded once per run and shared by every figure. Figures are built
+headlessly (nothing is shown or dumped to the console) and then exported
+concurrently through one render session. Each stage is timed; `build-all`
+also writes the timings to `timings.json` in the output directory.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from dataset import DEFAULT_PATH, HolidayDataset
+from profiling import span
+
+FORMATS = ["png", "svg", "pdf", "html"]
+
+
+class Timings:
+    """Wall-clock time of each named stage of a run"""
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            with span(name):
+                yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self):
+        width = max(map(len, self.stages), default=0)
+        for name, seconds in self.stages.items():
+            print(f"  {name:<{width}}  {seconds * 1000:9.1f} ms")
+
+
+class Report:
+    """Lazily built analysis objects over one shared dataset"""
+    def __init__(self, dataset: HolidayDataset):
+        self.dataset = dataset
+        self._choropleth = None
+        self._overlaps = None
+
+    @property
+    def choropleth(self):
+        if self._choropleth is None:
+            from visualization import Choropleth
+            self._choropleth = Choropleth(dataset=self.dataset)
+        return self._choropleth
+
+    @property
+    def overlaps(self):
+        if self._overlaps is None:
+            from analysis import EmpiricalOverlaps
+            self._overlaps = EmpiricalOverlaps(dataset=self.dataset)
+        return self._overlaps
+
+    @property
+    def counts(self):
+        """Per-day `HolidayCounts` behind the statistics"""
+        return self.overlaps.counts
+
+    def binomial(self):
+        from analysis import BinomialDistribution
+        return BinomialDistribution(n=self.overlaps.n, p=1/365)
+
+    def overlaps_theoretical(self):
+        return self.binomial().plot_distribution()
+
+    def overlaps_with_empirical(self):
+        from analysis import OccupancyDistribution
+        return self.overlaps.plot_combined_distribution(self.binomial(), bands=OccupancyDistribution(n=self.overlaps.n))
+
+
+# Output file stem ➜ how to build the figure
+FIGURES = {
+    "choropleth_map": lambda report: report.choropleth.plot(show=False),
+    "histogram_by_month": lambda report: report.choropleth.histogram_by_month(),
+    "bar_graph_season_counts": lambda report: report.choropleth.bar_graph_season_counts(show=False),
+    "hemisphere_season_analysis": lambda report: report.choropleth.hemisphere_season_analysis(),
+    "weekend_share_map": lambda report: report.choropleth.plot_weekend_share(show=False),
+    "independence_national_day_overlaps_theoretical": Report.overlaps_theoretical,
+    "independence_national_day_overlaps_with_empirical": Report.overlaps_with_empirical,
+}
+
+
+def statistics(counts, permutations: int = 0, seed: int = 0) -> dict:
+    """
+    Season, hemisphere and overlap statistics of `HolidayCounts` as plain
+    (JSON-serializable) values, plus permutation-test p-values if
+    `permutations` is given.
+    """
+    stats = {
+        "rows": counts.rows,
+        "season_counts": counts.season_counts().to_dict(),
+        "hemisphere_counts": counts.hemisphere_counts().to_dict(),
+        "hemisphere_season": {hemisphere: row.to_dict() for hemisphere, row in counts.hemisphere_season().iterrows()},
+        "overlap_counts": counts.overlap_counts(),
+    }
+    if permutations:
+        from simulation import PermutationTests
+        results = PermutationTests(permutations=permutations, seed=seed).all(*counts.codes())
+        stats["significance"] = {name: result._asdict() for name, result in results.items()}
+    return stats
+
+
+def export(figures: dict, output_dir: Path, format: str = "png", scale: int = 2, workers: int = 1):
+    """Write figures to `output_dir` concurrently; returns the written paths"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {name: output_dir / f"{name}.{format}" for name in figures}
+    if format == "html":
+        # No browser needed; plotly.js is referenced from the CDN to keep files small
+        for name, fig in figures.items():
+            fig.write_html(paths[name], include_plotlyjs="cdn")
+        return list(paths.values())
+
+    from render import RenderService
+    service = RenderService(tabs=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(service.write_image, fig, paths[name], format=format, scale=scale)
+                    for name, fig in figures.items()]
+            return [job.result() for job in jobs]
+    finally:
+        service.close()
+
+
+def print_statistics(stats: dict):
+    print(f"Rows: {stats['rows']}")
+    print("\nDistribution of Independence/National Days by Season:")
+    for season, count in stats["season_counts"].items():
+        print(f"  {season:<8} {count}")
+    print("\nCountries by Hemisphere:")
+    for hemisphere, count in stats["hemisphere_counts"].items():
+        print(f"  {hemisphere:<8} {count}")
+    print("\nSeason Distribution by Hemisphere:")
+    for hemisphere, seasons in stats["hemisphere_season"].items():
+        print(f"  {hemisphere:<8} " + ", ".join(f"{season} {count}" for season, count in seasons.items()))
+    print("\nDays with exactly k celebrations:")
+    for size, count in stats["overlap_counts"].items():
+        print(f"  k={size}  {count}")
+    if "significance" in stats:
+        print("\nPermutation tests:")
+        for name, result in stats["significance"].items():
+            print(f"  {name:<18} statistic {result['statistic']:8.3f}  p = {result['p_value']:.3g}")
+
+
+def cmd_stats(args, timings):
+    if args.stream:
+        # Counts are folded in chunk by chunk; the rows are never held in memory
+        from streaming import count_csv
+        with timings.stage("stream"):
+            counts = count_csv(args.data, args.chunksize)
+    else:
+        report = load_report(args, timings)
+        counts = report.counts
+    with timings.stage("statistics"):
+        stats = statistics(counts, args.permutations, args.seed)
+    if args.json:
+        print(json.dumps(stats, indent=2, default=int))
+    else:
+        print_statistics(stats)
+
+
+def cmd_figure(args, timings):
+    report = load_report(args, timings)
+    with timings.stage(f"build {args.name}"):
+        fig = FIGURES[args.name](report)
+    with timings.stage("export"):
+        [path] = export({args.name: fig}, args.output_dir, args.format, args.scale)
+    print(f"✓ Exported {args.name} to {str(path)!r}")
+
+
+def cmd_static_map(args, timings):
+    report = load_report(args, timings)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    with timings.stage("render static map"):
+        report.choropleth.export_static_map(args.output_dir / f"choropleth_map.{args.format}", args.width)
+
+
+def cmd_timeline(args, timings):
+    report = load_report(args, timings)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    with timings.stage("build timeline"):
+        report.choropleth.plot_timeline(show=False, frame_duration=args.frame_duration)
+    with timings.stage("export"):
+        report.choropleth.export_timeline(args.output_dir / "celebration_timeline.html", args.frame_duration)
+
+
+def cmd_report(args, timings):
+    from report_bundle import build_report
+
+    report = load_report(args, timings)
+    with timings.stage("build report"):
+        paths = build_report(report, args.output, args.gzip, args.permutations, args.seed)
+    for path in paths:
+        print(f"✓ Wrote {str(path)!r} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+def cmd_memory(args, timings):
+    report = load_report(args, timings)
+    with timings.stage("process"):
+        table = report.dataset.memory_report()
+    table['MB'] = (table['bytes'] / (1 << 20)).round(2)
+    print(f"Rows: {len(report.dataset)}")
+    print(table[['dtype', 'MB', 'bytes_per_row']].to_string(float_format="{:.2f}".format))
+
+
+def cmd_build_all(args, timings):
+    report = load_report(args, timings)
+    with timings.stage("statistics"):
+        stats = statistics(report.counts)
+    figures = {}
+    for name, build in FIGURES.items():
+        with timings.stage(f"build {name}"):
+            figures[name] = build(report)
+    with timings.stage("export"):
+        paths = export(figures, args.output_dir, args.format, args.scale, args.workers)
+
+    (args.output_dir / "statistics.json").write_text(json.dumps(stats, indent=2, default=int) + "\n")
+    (args.output_dir / "timings.json").write_text(json.dumps(
+        {name: round(seconds, 4) for name, seconds in timings.stages.items()}, indent=2) + "\n")
+    print(f"✓ Exported {len(paths)} figures and statistics to {str(args.output_dir)!r}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Independence and national day statistics and figures")
+    parser.add_argument("--data", default=DEFAULT_PATH, help="CSV of independence and national days")
+    parser.add_argument("--no-snapshot", action="store_true", help="parse the CSV instead of using the snapshot cache")
+    parser.add_argument("--quiet", action="store_true", help="don't print stage timings")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    stats = subcommands.add_parser("stats", help="print season, hemisphere and overlap statistics")
+    stats.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    stats.add_argument("--stream", action="store_true", help="read the CSV in chunks, in constant memory")
+    stats.add_argument("--chunksize", type=int, default=1_000_000, help="rows per chunk with --stream")
+    stats.add_argument("--permutations", type=int, default=0,
+                       help="add permutation-test p-values for season x hemisphere and uniformity over the year")
+    stats.add_argument("--seed", type=int, default=0, help="seed of the permutation tests")
+    stats.set_defaults(run=cmd_stats)
+
+    def add_export_options(subparser):
+        subparser.add_argument("-o", "--output-dir", type=Path, default=Path("images"))
+        subparser.add_argument("--format", choices=FORMATS, default="png")
+        subparser.add_argument("--scale", type=int, default=2)
+
+    figure = subcommands.add_parser("figure", help="build and export one figure")
+    figure.add_argument("name", choices=list(FIGURES))
+    add_export_options(figure)
+    figure.set_defaults(run=cmd_figure)
+
+    static_map = subcommands.add_parser("static-map", help="render the season map without plotly or a browser")
+    static_map.add_argument("-o", "--output-dir", type=Path, default=Path("images"))
+    static_map.add_argument("--format", choices=["png", "svg"], default="png")
+    static_map.add_argument("--width", type=int, default=1600, help="image width in pixels")
+    static_map.set_defaults(run=cmd_static_map)
+
+    timeline = subcommands.add_parser("timeline", help="animated day-by-day map of who is celebrating, as HTML")
+    timeline.add_argument("-o", "--output-dir", type=Path, default=Path("images"))
+    timeline.add_argument("--frame-duration", type=int, default=150, help="milliseconds per day when playing")
+    timeline.set_defaults(run=cmd_timeline)
+
+    bundle = subcommands.add_parser("report", help="every figure and statistic in one offline HTML file")
+    bundle.add_argument("-o", "--output", type=Path, default=Path("report.html"))
+    bundle.add_argument("--gzip", action="store_true", help="also write a gzipped copy")
+    bundle.add_argument("--permutations", type=int, default=0, help="add permutation-test p-values")
+    bundle.add_argument("--seed", type=int, default=0, help="seed of the permutation tests")
+    bundle.set_defaults(run=cmd_report)
+
+    memory = subcommands.add_parser("memory", help="print the bytes held by each column of the processed frame")
+    memory.set_defaults(run=cmd_memory)
+
+    build_all = subcommands.add_parser("build-all", help="build and export every figure and statistic")
+    add_export_options(build_all)
+    build_all.add_argument("--workers", type=int, default=4, help="concurrent renders")
+    build_all.set_defaults(run=cmd_build_all)
+    return parser
+
+
+def load_report(args, timings) -> Report:
+    with timings.stage("load"):
+        return Report(HolidayDataset.load(args.data, use_snapshot=not args.no_snapshot))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    timings = Timings()
+    args.run(args, timings)
+    if not args.quiet:
+        print("\nTimings:")
+        timings.report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+ISO 3166 country codes, centroids and hemispheres as dense lookup arrays.
+
+`data/countries.csv` lists every known region by numeric ISO code with its
+alpha-3 code and centroid. Centroids of regions present in the bundled
+Natural Earth boundary file (source "boundary") are precomputed from their
+geometry by `build_country_table`; regions too small for the boundary file
+carry a hand-entered point (source "point"). Adding a region is a new row in
+the CSV, not a code change.
+
+At runtime the table is turned, once per process, into arrays indexed by the
+numeric code (0-999), so resolving alpha-3 codes or hemispheres for any
+number of rows is a single fancy-indexing operation.
+"""
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dates import HEMISPHERES
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+COUNTRY_TABLE = DATA_DIR / "countries.csv"
+COUNTRY_NAMES = DATA_DIR / "country_names.csv"
+BOUNDARY_FILE = DATA_DIR / "naturalearth_lowres" / "naturalearth_lowres.shp"
+ISO_NUMERIC_SLOTS = 1000
+
+# Natural Earth leaves iso_a3 as -99 for a few countries
+BOUNDARY_NAME_FIXES = {'France': 'FRA', 'Norway': 'NOR'}
+
+
+def boundary_centroids(boundary_file=BOUNDARY_FILE) -> pd.DataFrame:
+    """Centroid latitude/longitude of each country's largest polygon, by alpha-3 code"""
+    import geopandas as gpd
+
+    world = gpd.read_file(boundary_file)
+    world['iso_alpha3'] = world['name'].map(BOUNDARY_NAME_FIXES).fillna(world['iso_a3'])
+    world = world[world['iso_alpha3'] != '-99']
+    # The largest polygon keeps overseas territories from dragging the
+    # centroid (e.g. French Guiana for France); areas are in an equal-area CRS
+    parts = (world[['iso_alpha3', 'geometry']].explode(index_parts=False)
+                  .reset_index(drop=True).to_crs('+proj=cea'))
+    parts = parts.loc[parts.geometry.area.groupby(parts['iso_alpha3']).idxmax()]
+    centroids = parts.geometry.centroid.to_crs(epsg=4326)
+    return pd.DataFrame({'latitude': centroids.y.round(4).to_numpy(),
+                         'longitude': centroids.x.round(4).to_numpy()},
+                        index=pd.Index(parts['iso_alpha3'].to_numpy(), name='iso_alpha3'))
+
+
+def build_country_table(boundary_file=BOUNDARY_FILE, table=COUNTRY_TABLE) -> pd.DataFrame:
+    """Recompute the centroids of boundary-sourced rows and rewrite the country table"""
+    countries = pd.read_csv(table)
+    centroids = boundary_centroids(boundary_file)
+    from_boundary = (countries['source'] == 'boundary') & countries['iso_alpha3'].isin(centroids.index)
+    matched = centroids.loc[countries.loc[from_boundary, 'iso_alpha3']]
+    countries.loc[from_boundary, ['latitude', 'longitude']] = matched.to_numpy()
+    countries.to_csv(table, index=False)
+    return countries
+
+
+@lru_cache(maxsize=None)
+def lookup_tables(table=COUNTRY_TABLE):
+    """
+    Arrays indexed by numeric ISO code: alpha-3 code (object, NaN if unknown),
+    centroid latitude (float, NaN if unknown) and hemisphere code (index into
+    dates.HEMISPHERES, 0 if unknown).
+    """
+    countries = pd.read_csv(table)
+    codes = countries['iso_numeric'].to_numpy()
+    alpha3 = np.full(ISO_NUMERIC_SLOTS, np.nan, dtype=object)
+    alpha3[codes] = countries['iso_alpha3'].to_numpy()
+    latitude = np.full(ISO_NUMERIC_SLOTS, np.nan)
+    latitude[codes] = countries['latitude'].to_numpy()
+    hemisphere = np.zeros(ISO_NUMERIC_SLOTS, dtype=np.uint8)
+    hemisphere[latitude >= 0] = HEMISPHERES.index('Northern')
+    hemisphere[latitude < 0] = HEMISPHERES.index('Southern')
+    for array in (alpha3, latitude, hemisphere):
+        array.flags.writeable = False
+    return alpha3, latitude, hemisphere
+
+
+def _slots(iso_numeric) -> np.ndarray:
+    """Numeric codes as array indices; missing or out-of-range codes map to slot 0 (unused by ISO)"""
+    values = pd.array(iso_numeric, dtype='Int64')
+    codes = values.to_numpy(dtype=np.int64, na_value=0)
+    codes[(codes < 0) | (codes >= ISO_NUMERIC_SLOTS)] = 0
+    return codes
+
+
+def iso_alpha3(iso_numeric) -> np.ndarray:
+    """Alpha-3 code for each numeric ISO code"""
+    return lookup_tables()[0][_slots(iso_numeric)]
+
+
+@lru_cache(maxsize=None)
+def _alpha3_categories(table=COUNTRY_TABLE):
+    """Known alpha-3 codes, and the position of each numeric slot's code among them (-1 if unknown)"""
+    alpha3 = lookup_tables(table)[0]
+    known = np.flatnonzero(pd.notna(alpha3))
+    position = np.full(ISO_NUMERIC_SLOTS, -1, dtype=np.int16)
+    position[known] = np.arange(len(known))
+    return pd.Index(alpha3[known]), position
+
+
+def iso_alpha3_codes(iso_numeric):
+    """
+    `iso_alpha3` as categorical codes: (codes, categories), with code -1
+    where the alpha-3 code is unknown. No per-row strings are built.
+    """
+    categories, position = _alpha3_categories()
+    return position[_slots(iso_numeric)], categories
+
+
+def iso_hemisphere_codes(iso_numeric) -> np.ndarray:
+    """Hemisphere code (index into dates.HEMISPHERES) for each numeric ISO code"""
+    return lookup_tables()[2][_slots(iso_numeric)]
+
+
+@lru_cache(maxsize=None)
+def _numeric_by_name(names=COUNTRY_NAMES) -> dict:
+    table = pd.read_csv(names)
+    return dict(zip(table['name'], table['iso_numeric']))
+
+
+def iso_numeric_for_names(country_names) -> pd.array:
+    """Numeric ISO code for each country name in `data/country_names.csv` (<NA> if not listed)"""
+    lookup = _numeric_by_name()
+    return pd.array([lookup.get(name) for name in country_names], dtype='Int64')
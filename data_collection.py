@@ -5,13 +5,38 @@ tables into a single CSV with one row per country:
 
 Country,has_independence_day,independence_day_date,
         has_national_day,national_day_date
+
+The scrape runs as separate stages (fetch, extract, build, merge). Pages are
+fetched concurrently through a backend: `HttpBackend` keeps an on-disk cache
+and revalidates it with ETag/Last-Modified, `FixtureBackend` serves local
+HTML files so the pipeline runs without network access. Only the matching
+table is extracted from each page, and extracted tables are cached by the
+hash of the page, so an unchanged page costs a cache lookup.
 """
+import argparse
+import asyncio
+import hashlib
+import html
+import json
 import re
+import urllib.error
+import urllib.request
+from io import StringIO
+from pathlib import Path
+
 import pandas as pd
+from lxml import etree, html as lxml_html
+
+from profiling import traced
 
 INDEP_URL   = "https://en.wikipedia.org/wiki/List_of_national_independence_days"
 NATDAY_URL  = "https://en.wikipedia.org/wiki/National_day"
 OUTFILE     = "independence_and_national_days.csv"
+CACHE_DIR   = Path(".http_cache")
+FIXTURE_DIR = Path("fixtures")
+
+INDEP_MATCH  = "List of independence days"
+NATDAY_MATCH = "Nation"
 
 def clean_country(raw: str) -> str:
     """Strip footnote markers, non-breaking spaces, etc."""
@@ -26,57 +51,191 @@ def tidy_dates(col: pd.Series) -> pd.Series:
               .str.replace("\n+", " / ", regex=True)
               .str.strip())
 
-# 1) ――― Independence-day table (only one wikitable)
-indep = (pd.read_html(INDEP_URL, match="List of independence days")[0]
-           .rename(columns={0: "Country",
-                            2: "Independence day date"}))   # column 2 = date
-indep["Country"] = indep["Country"].apply(clean_country)
-indep["Independence day date"] = tidy_dates(indep["Date of holiday"])
-indep["has_independence_day"] = True
-indep = indep[["Country", "has_independence_day", "Independence day date"]]
-
-# 2) ――― National-day tables (one per A/B/C… section, so concatenate)
-nat_tables = pd.read_html(NATDAY_URL, match="Nation")
-# returns a list, second item is something else
-nat_table_correct = nat_tables[0]
-
-# Drop provincial / sub-national entries ― they always show the parent state
-# in parentheses, e.g. “Åland (Finland)”, “Sicily (Italy)”, etc.
-is_subnational = nat_table_correct.iloc[:,0].str.contains(r"\(")
-nat_table_correct = nat_table_correct[~is_subnational]
-
-nat = (nat_table_correct.rename(columns={nat_table_correct.columns[0]: "Country",
-                           nat_table_correct.columns[1]: "National day date"})
-          .loc[:, ["Country", "National day date"]])
-nat["Country"] = nat["Country"].apply(clean_country)
-nat["National day date"] = tidy_dates(nat["National day date"])
-nat["has_national_day"] = True
-
-# 3) ――― Merge (outer join so every country appears once)
-
-# Handle duplicates by combining dates for the same country
-indep_combined = (indep.groupby('Country')
-                      .agg({
-                          'has_independence_day': 'first',
-                          'Independence day date': lambda x: ' / '.join(x.unique())
-                      })
-                      .reset_index())
-
-nat_combined = (nat.groupby('Country')
-                   .agg({
-                       'has_national_day': 'first',
-                       'National day date': lambda x: ' / '.join(x.unique())
-                   })
-                   .reset_index())
-
-merged = (pd.merge(indep_combined, nat_combined,
-                   on="Country", how="outer",
-                   indicator=False)
-            .fillna({"has_independence_day": False,
-                     "has_national_day": False,
-                     "Independence day date": "",
-                     "National day date": ""}))
-
-# 4) ――― Write CSV
-merged.sort_values("Country").to_csv(OUTFILE, index=False)
-print(f"✓ Wrote {len(merged)} rows to {OUTFILE!r}")
+def _cache_name(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+# ――― Fetch backends
+
+class HttpBackend:
+    """Fetch pages over HTTP, revalidating an on-disk cache with ETag/Last-Modified"""
+    def __init__(self, cache_dir=CACHE_DIR, timeout: float = 30):
+        self.cache_dir = Path(cache_dir)
+        self.timeout = timeout
+
+    def fetch(self, url: str) -> bytes:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body_path = self.cache_dir / f"{_cache_name(url)}.html"
+        meta_path = body_path.with_suffix(".json")
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() and body_path.exists() else {}
+
+        request = urllib.request.Request(url, headers={"User-Agent": "independence-days/1.0"})
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as err:
+            if err.code == 304:                    # not modified ➜ cached copy
+                return body_path.read_bytes()
+            raise
+
+        body_path.write_bytes(body)
+        meta_path.write_text(json.dumps({"url": url,
+                                         "etag": headers.get("ETag"),
+                                         "last_modified": headers.get("Last-Modified")}))
+        return body
+
+class FixtureBackend:
+    """Serve pages from local HTML files named after the last URL path segment"""
+    def __init__(self, directory=FIXTURE_DIR):
+        self.directory = Path(directory)
+
+    def path_for(self, url: str) -> Path:
+        return self.directory / f"{url.rstrip('/').rsplit('/', 1)[-1]}.html"
+
+    def fetch(self, url: str) -> bytes:
+        return self.path_for(url).read_bytes()
+
+@traced("data_collection.fetch_pages")
+async def fetch_pages(urls, backend) -> dict:
+    """Fetch every URL concurrently; returns {url: page bytes}"""
+    bodies = await asyncio.gather(*(asyncio.to_thread(backend.fetch, url) for url in urls))
+    return dict(zip(urls, bodies))
+
+# ――― Table extraction
+
+@traced("data_collection.extract_table")
+def extract_table(page: bytes, match: str) -> pd.DataFrame:
+    """Parse only the innermost table whose text contains `match`"""
+    tree = lxml_html.fromstring(page, parser=lxml_html.HTMLParser(encoding="utf-8"))
+    tables = tree.xpath("//table[contains(., $m) and not(.//table[contains(., $m)])]", m=match)
+    if not tables:
+        raise ValueError(f"No table matching {match!r} found")
+    return pd.read_html(StringIO(etree.tostring(tables[0], encoding="unicode")))[0]
+
+@traced("data_collection.extract_table_cached")
+def extract_table_cached(page: bytes, match: str, cache_dir=CACHE_DIR) -> pd.DataFrame:
+    """`extract_table`, memoized on disk by the hash of the page and match text"""
+    cache_dir = Path(cache_dir)
+    key = hashlib.sha256(page + match.encode()).hexdigest()[:32]
+    cached = cache_dir / f"{key}.table.pkl"
+    if cached.exists():
+        return pd.read_pickle(cached)
+    table = extract_table(page, match)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    table.to_pickle(cached)
+    return table
+
+# ――― Build and merge
+
+@traced("data_collection.build_independence_table")
+def build_independence_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Independence-day table (only one wikitable)"""
+    indep = table.rename(columns={0: "Country",
+                                  2: "Independence day date"})   # column 2 = date
+    indep["Country"] = indep["Country"].apply(clean_country)
+    indep["Independence day date"] = tidy_dates(indep["Date of holiday"])
+    indep["has_independence_day"] = True
+    return indep[["Country", "has_independence_day", "Independence day date"]]
+
+@traced("data_collection.build_national_day_table")
+def build_national_day_table(table: pd.DataFrame) -> pd.DataFrame:
+    """National-day table"""
+    # Drop provincial / sub-national entries ― they always show the parent state
+    # in parentheses, e.g. “Åland (Finland)”, “Sicily (Italy)”, etc.
+    is_subnational = table.iloc[:,0].str.contains(r"\(")
+    table = table[~is_subnational]
+
+    nat = (table.rename(columns={table.columns[0]: "Country",
+                                 table.columns[1]: "National day date"})
+                .loc[:, ["Country", "National day date"]])
+    nat["Country"] = nat["Country"].apply(clean_country)
+    nat["National day date"] = tidy_dates(nat["National day date"])
+    nat["has_national_day"] = True
+    return nat
+
+@traced("data_collection.merge_tables")
+def merge_tables(indep: pd.DataFrame, nat: pd.DataFrame) -> pd.DataFrame:
+    """Merge (outer join so every country appears once)"""
+    # Handle duplicates by combining dates for the same country
+    indep_combined = (indep.groupby('Country')
+                          .agg({
+                              'has_independence_day': 'first',
+                              'Independence day date': lambda x: ' / '.join(x.unique())
+                          })
+                          .reset_index())
+
+    nat_combined = (nat.groupby('Country')
+                       .agg({
+                           'has_national_day': 'first',
+                           'National day date': lambda x: ' / '.join(x.unique())
+                       })
+                       .reset_index())
+
+    merged = (pd.merge(indep_combined, nat_combined,
+                       on="Country", how="outer",
+                       indicator=False)
+                .fillna({"Independence day date": "",
+                         "National day date": ""}))
+    # Countries missing from one table have no flag there; casting first avoids object-column downcasting
+    for flag in ("has_independence_day", "has_national_day"):
+        merged[flag] = merged[flag].astype("boolean").fillna(False).astype(bool)
+    return merged.sort_values("Country")
+
+@traced("data_collection.collect")
+def collect(backend=None, outfile=OUTFILE, cache_dir=CACHE_DIR) -> pd.DataFrame:
+    """Run every stage and write the merged CSV"""
+    backend = backend or HttpBackend(cache_dir)
+    pages = asyncio.run(fetch_pages([INDEP_URL, NATDAY_URL], backend))
+    indep = build_independence_table(extract_table_cached(pages[INDEP_URL], INDEP_MATCH, cache_dir))
+    nat = build_national_day_table(extract_table_cached(pages[NATDAY_URL], NATDAY_MATCH, cache_dir))
+    merged = merge_tables(indep, nat)
+    merged.to_csv(outfile, index=False)
+    print(f"✓ Wrote {len(merged)} rows to {outfile!r}")
+    return merged
+
+# ――― Offline fixtures
+
+def _fixture_page(title: str, caption: str, header, rows) -> str:
+    cells = lambda tag, values: "".join(f"<{tag}>{html.escape(str(v))}</{tag}>" for v in values)
+    body = "\n".join(f"<tr>{cells('td', row)}</tr>" for row in rows)
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head><body>\n"
+            f"<table class=\"wikitable sortable\"><caption>{html.escape(caption)}</caption>\n"
+            f"<tr>{cells('th', header)}</tr>\n{body}\n</table>\n</body></html>\n")
+
+def write_fixtures(raw_csv="independence_and_national_days_raw.csv", directory=FIXTURE_DIR):
+    """Write stand-in Wikipedia pages reproducing a previously scraped CSV"""
+    raw = pd.read_csv(raw_csv, keep_default_na=False)
+    backend = FixtureBackend(directory)
+    backend.directory.mkdir(parents=True, exist_ok=True)
+
+    indep = raw[raw["has_independence_day"]]
+    backend.path_for(INDEP_URL).write_text(_fixture_page(
+        "List of national independence days", INDEP_MATCH,
+        ["Country", "Date of holiday"],
+        zip(indep["Country"], indep["Independence day date"])), encoding="utf-8")
+
+    nat = raw[raw["has_national_day"]]
+    backend.path_for(NATDAY_URL).write_text(_fixture_page(
+        "National day", "National days by nation",
+        ["Nation", "Date"],
+        zip(nat["Country"], nat["National day date"])), encoding="utf-8")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--offline", action="store_true",
+                        help=f"read pages from local fixtures in {FIXTURE_DIR}/ instead of Wikipedia")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="fixture directory for --offline")
+    parser.add_argument("--output", default=OUTFILE)
+    parser.add_argument("--normalize", metavar="UPDATED_CSV", nargs="?", const="independence_and_national_days_updated.csv",
+                        help="also write the normalized analysis CSV (see normalization.py)")
+    args = parser.parse_args()
+
+    collect(FixtureBackend(args.fixtures) if args.offline else None, outfile=args.output)
+    if args.normalize:
+        from normalization import normalize_file
+        normalize_file(args.output, args.normalize)
@@ -0,0 +1,242 @@
+"""
+The holiday table, parsed once per process and shared by every analysis.
+
+`HolidayDataset` holds the CSV contents in a compact schema: country names
+and display dates as categoricals, the numeric ISO code (0 if missing) and the
+parsed day-of-year as uint16, the flags as bool. The raw independence and
+national day date strings are not kept. Everything else (ISO alpha-3 code,
+hemisphere, date, month, seasons) is derived lazily on first access and
+memoized, labels as categoricals over their integer codes, so groupbys run on
+the codes. `memory_report()` shows what each column costs.
+
+The object is immutable: derived arrays are read-only and it carries a
+`version` string that changes whenever the underlying data does, so results
+computed from it can be cached against that version.
+"""
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from countries import iso_alpha3_codes, iso_hemisphere_codes
+from dates import DAYS_IN_YEAR, HEMISPHERES, SEASONS, UNKNOWN_DAY, month_of, parse_display_dates, season_codes
+from profiling import span, traced
+from snapshot import SNAPSHOT_VERSION, file_digest, load_cached
+
+DEFAULT_PATH = "independence_and_national_days_updated.csv"
+
+# Columns kept from the CSV, and the dtypes they are read as
+COLUMNS = ['Country', 'has_independence_day', 'has_national_day', 'ISO Code', 'Display Date']
+_READ_DTYPES = {'Country': 'category', 'Display Date': 'category'}
+# Source date columns; only read (lazily) to tell which one the display date came from
+SOURCE_COLUMNS = ['Independence day date', 'National day date']
+# Derived columns, in the order they are appended to `df`
+DERIVED_COLUMNS = ['ISO_3', 'hemisphere', 'month', 'season', 'local_season']
+
+_loaded = {}
+
+
+@traced("HolidayDataset.parse")
+def _read_table(path_to_data):
+    """Read the CSV and parse the columns every consumer needs"""
+    with span("read_csv", path=str(path_to_data)) as record:
+        table = pd.read_csv(path_to_data, usecols=COLUMNS, dtype=_READ_DTYPES)
+        record["rows"] = len(table)
+    return _compact(table)
+
+
+def _compact(frame: pd.DataFrame) -> pd.DataFrame:
+    """The CSV's columns in the compact schema, plus the parsed day-of-year"""
+    iso = pd.to_numeric(frame['ISO Code'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    # Missing and out-of-range codes become 0, which ISO never assigns
+    iso = np.where((iso >= 1) & (iso <= np.iinfo(np.uint16).max), iso, 0).astype(np.uint16)
+    display_date = _category(frame['Display Date'])
+    return pd.DataFrame({
+        'Country': _category(frame['Country']),
+        'has_independence_day': _flag(frame['has_independence_day']),
+        'has_national_day': _flag(frame['has_national_day']),
+        'ISO Code': iso,
+        'Display Date': display_date,
+        'day_of_year': parse_display_dates(display_date),
+    }, index=frame.index)
+
+
+def _day_in_column(sources: pd.DataFrame, column: str, day_of_year: np.ndarray) -> np.ndarray:
+    """Whether each row's day-of-year is one of the dates in its cell of a source date column"""
+    from normalization import parse_cell
+
+    if column not in sources:
+        return np.zeros(len(day_of_year), dtype=bool)
+    # Each distinct cell is parsed once into a (cell, day) lookup table
+    codes, cells = pd.factorize(sources[column])
+    in_cell = np.zeros((len(cells) + 1, DAYS_IN_YEAR + 1), dtype=bool)
+    for code, cell in enumerate(cells):
+        in_cell[code, list(parse_cell(str(cell)))] = True
+    # Missing cells (code -1) read the last, all-False row
+    return in_cell[codes, day_of_year]
+
+
+def _category(column: pd.Series) -> pd.Series:
+    return column if isinstance(column.dtype, pd.CategoricalDtype) else column.astype('category')
+
+
+def _flag(column: pd.Series) -> np.ndarray:
+    """Boolean column as plain bool, missing values as False"""
+    if column.dtype == bool:
+        return column.to_numpy()
+    return column.astype('boolean').to_numpy(dtype=bool, na_value=False)
+
+
+def _freeze(values: np.ndarray) -> np.ndarray:
+    """Mark a derived array read-only so shared copies cannot be edited in place"""
+    values.flags.writeable = False
+    return values
+
+
+class HolidayDataset:
+    def __init__(self, table: pd.DataFrame, version: str, sources=None):
+        self._table = table
+        self._version = version
+        # Zero-argument callable returning the source date columns, row-aligned with `table`
+        self._sources = sources
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    @classmethod
+    @traced("HolidayDataset.from_csv")
+    def from_csv(cls, path_to_data: str = DEFAULT_PATH, use_snapshot: bool = True, digest: str = None):
+        """
+        Parse a CSV into a new dataset (through the snapshot cache unless
+        disabled); `digest` may be passed when the caller has already hashed
+        the file.
+        """
+        digest = digest or file_digest(path_to_data)
+        if use_snapshot:
+            table = load_cached(path_to_data, "dataset", _read_table, digest=digest)
+        else:
+            table = _read_table(path_to_data)
+        sources = lambda: pd.read_csv(path_to_data, usecols=SOURCE_COLUMNS, dtype='category')
+        return cls(table, f"{digest[:16]}-v{SNAPSHOT_VERSION}", sources)
+
+    @classmethod
+    @traced("HolidayDataset.from_frame")
+    def from_frame(cls, frame: pd.DataFrame):
+        """Build a dataset from a frame with the CSV's columns"""
+        table = _compact(frame)
+        version = f"{pd.util.hash_pandas_object(table, index=True).sum():016x}-v{SNAPSHOT_VERSION}"
+        sources = frame[[column for column in SOURCE_COLUMNS if column in frame]]
+        return cls(table, version, lambda: sources)
+
+    @classmethod
+    @traced("HolidayDataset.load")
+    def load(cls, path_to_data: str = DEFAULT_PATH, use_snapshot: bool = True):
+        """The process-wide dataset for a CSV, reparsed only if the file changed"""
+        key = (str(Path(path_to_data).resolve()), use_snapshot)
+        digest = file_digest(path_to_data)
+        version = f"{digest[:16]}-v{SNAPSHOT_VERSION}"
+        dataset = _loaded.get(key)
+        if dataset is None or dataset.version != version:
+            dataset = _loaded[key] = cls.from_csv(path_to_data, use_snapshot, digest)
+        return dataset
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """The parsed CSV columns (without derived columns)"""
+        return self._table
+
+    def __len__(self):
+        return len(self._table)
+
+    @property
+    def day_of_year(self) -> pd.Series:
+        return self._table['day_of_year']
+
+    def _derived(self, name, values) -> pd.Series:
+        return pd.Series(_freeze(values), index=self._table.index, name=name, copy=False)
+
+    def _categorical(self, name, codes, categories) -> pd.Series:
+        """A derived categorical over read-only codes (-1 for missing)"""
+        values = pd.Categorical.from_codes(_freeze(codes), categories=categories)
+        return pd.Series(values, index=self._table.index, name=name, copy=False)
+
+    @cached_property
+    def ISO_3(self) -> pd.Series:
+        """Three-letter ISO code for each row"""
+        return self._categorical('ISO_3', *iso_alpha3_codes(self._table['ISO Code']))
+
+    @cached_property
+    def hemisphere_code(self) -> np.ndarray:
+        """Hemisphere of each row's country centroid, as indices into dates.HEMISPHERES"""
+        return _freeze(iso_hemisphere_codes(self._table['ISO Code']))
+
+    @cached_property
+    def hemisphere(self) -> pd.Series:
+        # Code 0 (unknown) becomes -1, i.e. missing
+        return self._categorical('hemisphere', self.hemisphere_code.astype(np.int8) - 1, HEMISPHERES[1:])
+
+    @cached_property
+    def date(self) -> pd.Series:
+        """Day-of-year as a date in the (leap) year 2000, NaT where unknown"""
+        day = self.day_of_year.to_numpy()
+        dates = np.datetime64('1999-12-31', 'D') + day.astype('timedelta64[D]')
+        dates = dates.astype('datetime64[ns]')
+        dates[day == UNKNOWN_DAY] = np.datetime64('NaT')
+        return self._derived('date', dates)
+
+    @cached_property
+    def month(self) -> pd.Series:
+        """Month number, 0 where the date is unknown"""
+        return self._derived('month', month_of(self.day_of_year.to_numpy()))
+
+    @cached_property
+    def season(self) -> pd.Series:
+        """Season on the Northern Hemisphere calendar"""
+        return self._categorical('season', season_codes(self.day_of_year.to_numpy()).astype(np.int8), SEASONS)
+
+    @cached_property
+    def local_season(self) -> pd.Series:
+        """Season as experienced locally, using the hemisphere of each country"""
+        codes = season_codes(self.day_of_year.to_numpy(), self.hemisphere_code)
+        return self._categorical('local_season', codes.astype(np.int8), SEASONS)
+
+    @cached_property
+    def display_is_independence_day(self) -> pd.Series:
+        """
+        Whether each row's display date is one of its independence days (rather
+        than a national day); display dates in neither source column keep
+        `has_independence_day`. The source columns are only read on first use.
+        """
+        day = self.day_of_year.to_numpy()
+        sources = self._sources() if self._sources is not None else pd.DataFrame(index=self._table.index)
+        independence, national = (_day_in_column(sources, column, day) for column in SOURCE_COLUMNS)
+        flag = self._table['has_independence_day'].to_numpy() & (independence | ~national)
+        return self._derived('display_is_independence_day', flag)
+
+    @cached_property
+    def df(self) -> pd.DataFrame:
+        """The parsed table with every derived column; shared, so treat as read-only"""
+        derived = {name: getattr(self, name) for name in DERIVED_COLUMNS}
+        return pd.concat([self._table, pd.DataFrame(derived, copy=False)], axis=1, copy=False)
+
+    def memory_report(self) -> pd.DataFrame:
+        """Dtype and bytes (deep, counting categories and strings) of each column of `df`, with a total"""
+        df = self.df
+        usage = df.memory_usage(deep=True, index=False)
+        rows = max(len(df), 1)
+        report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage, 'bytes_per_row': usage / rows})
+        report.loc['total'] = ['', usage.sum(), usage.sum() / rows]
+        return report
+
+    @cached_property
+    def dated(self) -> pd.DataFrame:
+        """Parsed rows (without derived columns) whose display date is known"""
+        return self._table[self.day_of_year != UNKNOWN_DAY]
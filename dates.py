@@ -0,0 +1,117 @@
+"""
+Vectorized parsing of ``Display Date`` strings ("DD.MMM") into day-of-year
+numbers, plus lookup tables that turn a day-of-year into a month or season.
+
+Days are counted on a leap-year calendar (1 = 01.Jan, 60 = 29.Feb,
+366 = 31.Dec) so every calendar date has a slot. Day 0 is reserved for
+dates that could not be parsed, which keeps every table 367 entries long
+and lets unknown values flow through the lookups without special casing.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+MONTH_ABBREVIATIONS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+DAYS_IN_MONTH = np.array([31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+MONTH_OFFSETS = np.concatenate(([0], np.cumsum(DAYS_IN_MONTH)[:-1]))
+DAYS_IN_YEAR = 366
+UNKNOWN_DAY = 0
+
+SEASONS = ['Unknown', 'Winter', 'Spring', 'Summer', 'Fall']
+HEMISPHERES = ['Unknown', 'Northern', 'Southern']
+
+_DISPLAY_DATE_PATTERN = r'^\s*(\d{1,2})\.([A-Za-z]{3})\s*$'
+_MONTH_NUMBERS = {name.lower(): i + 1 for i, name in enumerate(MONTH_ABBREVIATIONS)}
+
+
+def _build_month_table():
+    """Month number (1-12) for each day-of-year, 0 for the unknown slot"""
+    table = np.zeros(DAYS_IN_YEAR + 1, dtype=np.uint8)
+    table[1:] = np.repeat(np.arange(1, 13, dtype=np.uint8), DAYS_IN_MONTH)
+    return table
+
+
+def _build_season_table(month_table):
+    """Season codes (indices into SEASONS) by hemisphere and day-of-year"""
+    # Meteorological seasons by month, Northern Hemisphere
+    northern_by_month = np.array([0, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 1], dtype=np.uint8)
+    # Southern seasons are the Northern ones shifted by half a year
+    southern_by_month = np.array([0, 3, 3, 4, 4, 4, 1, 1, 1, 2, 2, 2, 3], dtype=np.uint8)
+    table = np.zeros((len(HEMISPHERES), DAYS_IN_YEAR + 1), dtype=np.uint8)
+    table[1] = northern_by_month[month_table]
+    table[2] = southern_by_month[month_table]
+    return table
+
+
+MONTH_BY_DAY = _build_month_table()
+SEASON_BY_HEMISPHERE_AND_DAY = _build_season_table(MONTH_BY_DAY)
+SEASON_BY_DAY = SEASON_BY_HEMISPHERE_AND_DAY[1]
+
+
+def parse_display_dates(dates: pd.Series) -> np.ndarray:
+    """Parse "DD.MMM" strings into a uint16 day-of-year array (0 where unparseable)"""
+    # Only the distinct strings are parsed; there are at most a few hundred
+    # of them no matter how many rows the frame has.
+    codes, uniques = pd.factorize(pd.Series(dates, copy=False))
+    parts = pd.Series(uniques, dtype=object).str.extract(_DISPLAY_DATE_PATTERN)
+    day = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    month = parts[1].str.lower().map(_MONTH_NUMBERS).to_numpy(dtype=float, na_value=np.nan)
+
+    valid = ~np.isnan(day) & ~np.isnan(month)
+    month_index = np.where(valid, month, 1).astype(np.intp) - 1
+    valid &= (day >= 1) & (day <= DAYS_IN_MONTH[month_index])
+
+    unique_days = np.zeros(len(uniques) + 1, dtype=np.uint16)
+    unique_days[:-1][valid] = MONTH_OFFSETS[month_index[valid]] + day[valid]
+    # Missing values are factorized to -1, which picks the trailing unknown slot
+    return unique_days[codes]
+
+
+def parse_display_date(text: str) -> int:
+    """Scalar `parse_display_dates`: day-of-year of one "DD.MMM" string (0 if unparseable)"""
+    match = re.match(_DISPLAY_DATE_PATTERN, text) if isinstance(text, str) else None
+    if match is None:
+        return UNKNOWN_DAY
+    day, month = int(match[1]), _MONTH_NUMBERS.get(match[2].lower())
+    if month is None or not 1 <= day <= DAYS_IN_MONTH[month - 1]:
+        return UNKNOWN_DAY
+    return int(MONTH_OFFSETS[month - 1]) + day
+
+
+def display_date(day_of_year: int) -> str:
+    """"DD.MMM" string for a day-of-year (inverse of `parse_display_date`)"""
+    if not 1 <= day_of_year <= DAYS_IN_YEAR:
+        raise ValueError(f"day of year must be in 1..{DAYS_IN_YEAR}, got {day_of_year}")
+    month = int(MONTH_BY_DAY[day_of_year])
+    return f"{day_of_year - int(MONTH_OFFSETS[month - 1]):02d}.{MONTH_ABBREVIATIONS[month - 1]}"
+
+
+def hemisphere_codes(hemispheres: pd.Series) -> np.ndarray:
+    """Encode hemisphere labels as indices into HEMISPHERES (0 for missing)"""
+    lookup = {name: code for code, name in enumerate(HEMISPHERES)}
+    return pd.Series(hemispheres, copy=False).map(lookup).fillna(0).to_numpy(dtype=np.uint8)
+
+
+def month_of(day_of_year: np.ndarray) -> np.ndarray:
+    """Month number (1-12) for each day-of-year, 0 where the date is unknown"""
+    return MONTH_BY_DAY[day_of_year]
+
+
+def season_codes(day_of_year: np.ndarray, hemisphere: np.ndarray = None) -> np.ndarray:
+    """Season code (index into SEASONS) for each day-of-year; see `season_of`"""
+    if hemisphere is None:
+        return SEASON_BY_DAY[day_of_year]
+    return SEASON_BY_HEMISPHERE_AND_DAY[hemisphere, day_of_year]
+
+
+def season_of(day_of_year: np.ndarray, hemisphere: np.ndarray = None) -> np.ndarray:
+    """
+    Season label for each day-of-year.
+
+    Without ``hemisphere`` the Northern Hemisphere calendar is used for every
+    row. With it (codes from ``hemisphere_codes``) each row gets its local
+    season, and rows with an unknown hemisphere come back as 'Unknown'.
+    """
+    return np.asarray(SEASONS, dtype=object)[season_codes(day_of_year, hemisphere)]
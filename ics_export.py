@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+iCalendar (.ics) feeds of the holidays, streamed.
+
+    python ics_export.py -o feeds                          # one feed per country plus all.ics, 1900-2100
+    python ics_export.py -o feeds --years 2025 2035 --countries France Ghana --no-per-country
+
+`iter_ics` yields a calendar's lines (already folded and CRLF-terminated)
+one event at a time. Dates come from `CalendarExpansion`, run over blocks of
+rows so memory is bounded by the block size rather than the feed size, and
+each block's event text is produced with vectorized string operations.
+`write_ics` encodes and writes the lines through a fixed-size buffer to a
+path or any binary file object (a socket's `makefile("wb")`, an HTTP
+response body, ...).
+
+Each (country, year) is one all-day VEVENT. UIDs are built from the ISO code
+and the day of the year, so they are stable across exports (a re-published
+feed updates events in place) and alias rows for the same holiday ("Ivory
+Coast" and "Cote d'Ivoire") collapse into one event.
+"""
+import argparse
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from calendar_expansion import DEFAULT_YEARS, LEAP_DAY_POLICIES, CalendarExpansion
+from dataset import DEFAULT_PATH, HolidayDataset
+from dates import UNKNOWN_DAY
+
+PRODUCT_ID = "-//independence-and-national-days//ics_export//EN"
+UID_DOMAIN = "independence-national-days"
+# (row, year) cells expanded at a time; bounds the memory of a feed of any size
+BLOCK_CELLS = 1 << 15
+BUFFER_SIZE = 1 << 16
+
+
+def _escape(text: str) -> str:
+    """Escape a TEXT value (RFC 5545 3.3.11)"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1), CRLF-terminated"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a UTF-8 sequence
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74          # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def slug(country: str) -> str:
+    """File-name and UID-safe form of a country name"""
+    return re.sub(r"[^a-z0-9]+", "-", country.lower()).strip("-")
+
+
+def feed_frame(dataset):
+    """`dataset.df` plus the column saying which source each display date came from, for `iter_ics`"""
+    return dataset.df.assign(display_is_independence_day=dataset.display_is_independence_day)
+
+
+def _event_templates(df) -> list:
+    """
+    Per-row VEVENT text with {date}, {end} and {year} left to fill, for rows
+    with a known date. Events are labelled by the source of the display date
+    (see `feed_frame`), or by `has_independence_day` without that column.
+    """
+    templates = []
+    labels = df['display_is_independence_day'] if 'display_is_independence_day' in df else df['has_independence_day']
+    for country, independence, key, day in zip(df['Country'], labels, _holiday_keys(df), df['day_of_year']):
+        kind = "Independence Day" if independence else "National Day"
+        templates.append(
+            "BEGIN:VEVENT\r\n"
+            f"UID:{slug(key)}-{day:03d}-{{year}}@{UID_DOMAIN}\r\n"
+            "DTSTAMP:{stamp}\r\n"
+            "DTSTART;VALUE=DATE:{date}\r\n"
+            "DTEND;VALUE=DATE:{end}\r\n"
+            + _fold(f"SUMMARY:{_escape(f'{country} {kind}')}").replace("{", "{{").replace("}", "}}")
+            + _fold(f"CATEGORIES:{_escape(kind)}")
+            + "TRANSP:TRANSPARENT\r\n"
+            "END:VEVENT\r\n"
+        )
+    return templates
+
+
+def _basic_dates(dates: np.ndarray) -> np.ndarray:
+    """datetime64[D] ➜ "YYYYMMDD" strings"""
+    return np.char.replace(np.datetime_as_string(dates, unit="D"), "-", "")
+
+
+def _holiday_keys(df):
+    """ISO alpha-3 code of each row, or the country name where it has none"""
+    iso, country = df['ISO_3'].astype(object), df['Country'].astype(object)
+    return iso.where(iso.notna() & (iso != ""), country)
+
+
+def select_rows(df, countries=None):
+    """
+    Rows of `df` with a known date, limited to `countries` (names,
+    case-insensitive) if given, with repeated holidays (same ISO code and day)
+    kept once.
+    """
+    rows = df[df['day_of_year'] != UNKNOWN_DAY]
+    if countries is not None:
+        wanted = {name.lower() for name in countries}
+        rows = rows[rows['Country'].str.lower().isin(wanted)]
+    return rows[~rows.assign(key=_holiday_keys(rows)).duplicated(['key', 'day_of_year'])]
+
+
+def iter_ics(df, years=DEFAULT_YEARS, countries=None, leap_day: str = "feb28", name: str = None,
+             stamp: datetime = None, block_cells: int = BLOCK_CELLS):
+    """
+    Lines of a VCALENDAR with one event per (country, year), streamed.
+
+    `df` is a processed table (`feed_frame(dataset)`, or `HolidayDataset.df`); rows
+    without a date, and cells dropped by the leap-day policy, are skipped.
+    """
+    rows = select_rows(df, countries)
+    stamp = (stamp or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+    yield f"PRODID:{PRODUCT_ID}\r\nCALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n"
+    if name:
+        yield _fold(f"X-WR-CALNAME:{_escape(name)}")
+
+    years = np.asarray(years)
+    block_rows = max(block_cells // max(len(years), 1), 1)
+    for start in range(0, len(rows), block_rows):
+        block = rows.iloc[start:start + block_rows]
+        expansion = CalendarExpansion(block['day_of_year'].to_numpy(), years, leap_day)
+        dates = expansion.dates
+        valid = ~np.isnat(dates)
+        starts = _basic_dates(np.where(valid, dates, np.datetime64("1970-01-01")))
+        ends = _basic_dates(np.where(valid, dates + np.timedelta64(1, "D"), np.datetime64("1970-01-01")))
+        for row, template in enumerate(_event_templates(block)):
+            for column in np.flatnonzero(valid[row]):
+                yield template.format(year=years[column], stamp=stamp, date=starts[row, column],
+                                      end=ends[row, column])
+    yield "END:VCALENDAR\r\n"
+
+
+def write_ics(lines, sink, buffer_size: int = BUFFER_SIZE) -> int:
+    """Write `lines` to a path or a binary file object through a bounded buffer; returns bytes written"""
+    if isinstance(sink, (str, Path)):
+        with open(sink, "wb") as f:
+            return write_ics(lines, f, buffer_size)
+    buffer, size, written = [], 0, 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            sink.write(b"".join(buffer))
+            written += size
+            buffer, size = [], 0
+    sink.write(b"".join(buffer))
+    return written + size
+
+
+def export_feeds(df, output_dir, years=DEFAULT_YEARS, countries=None, leap_day: str = "feb28",
+                 per_country: bool = True, combined: bool = True) -> list:
+    """Write `<country>.ics` per country and/or `all.ics`; returns the written paths"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc)
+    span = f"{min(years)}-{max(years)}"
+    paths = []
+    if combined:
+        path = output_dir / "all.ics"
+        write_ics(iter_ics(df, years, countries, leap_day, f"Independence and National Days {span}", stamp), path)
+        paths.append(path)
+    if per_country:
+        for country in select_rows(df, countries)['Country'].unique():
+            path = output_dir / f"{slug(country)}.ics"
+            write_ics(iter_ics(df, years, [country], leap_day, f"{country} {span}", stamp), path)
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export iCalendar feeds of the holidays")
+    parser.add_argument("--data", default=DEFAULT_PATH)
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("feeds"))
+    parser.add_argument("--years", type=int, nargs=2, metavar=("FIRST", "LAST"),
+                        default=(DEFAULT_YEARS.start, DEFAULT_YEARS.stop - 1))
+    parser.add_argument("--countries", nargs="*", help="limit to these countries")
+    parser.add_argument("--leap-day", choices=LEAP_DAY_POLICIES, default="feb28",
+                        help="where 29 February holidays fall in common years")
+    parser.add_argument("--no-per-country", action="store_true", help="only write the combined all.ics")
+    parser.add_argument("--no-combined", action="store_true", help="only write per-country feeds")
+    args = parser.parse_args()
+
+    df = feed_frame(HolidayDataset.load(args.data))
+    paths = export_feeds(df, args.output_dir, range(args.years[0], args.years[1] + 1), args.countries,
+                         args.leap_day, per_country=not args.no_per_country, combined=not args.no_combined)
+    print(f"✓ Wrote {len(paths)} feeds to {str(args.output_dir)!r}")
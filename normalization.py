@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Normalize the scraped CSV into the analysis CSV.
+
+The scrape (`data_collection.py`) keeps Wikipedia's date strings as they are:
+"28.Nov", "19 August / 15 February", "14 and 15 May", "5 June (unofficial)",
+lunar-calendar dates, and so on. This stage
+
+1. explodes every date cell into a long table with one row per date,
+   recognising each piece's format with compiled regexes (each distinct cell
+   string is parsed once and memoized),
+2. picks each country's display date with a configurable rule,
+3. applies the reviewed corrections in `data/normalization_overrides.csv`,
+4. attaches numeric ISO codes from `data/country_names.csv`, and
+5. writes the updated CSV in the raw table's row order, byte-for-byte
+   reproducibly.
+
+Countries without an ISO code (historical states) or without any Gregorian
+date are dropped and listed on stdout.
+
+    python normalization.py                      # raw CSV ➜ updated CSV
+    python normalization.py --rule earliest      # a different display-date rule
+"""
+import argparse
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from countries import DATA_DIR, iso_numeric_for_names
+from dates import DAYS_IN_MONTH, MONTH_OFFSETS, UNKNOWN_DAY, display_date
+
+RAW_PATH = "independence_and_national_days_raw.csv"
+UPDATED_PATH = "independence_and_national_days_updated.csv"
+OVERRIDES = DATA_DIR / "normalization_overrides.csv"
+
+SOURCES = {"independence": "Independence day date", "national": "National day date"}
+COLUMNS = ["Country", "has_independence_day", "Independence day date",
+           "has_national_day", "National day date", "ISO Code", "Display Date"]
+RULES = ["shared", "independence", "national", "earliest"]
+
+_MONTH_NAMES = ["january", "february", "march", "april", "may", "june", "july",
+                "august", "september", "october", "november", "december"]
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+# Piece formats, tried in order; each yields (day, month name) pairs
+_FORMATS = [
+    ("dotted", re.compile(r"^(\d{1,2})\.([A-Za-z]{3})$")),                        # 28.Nov
+    ("day_range", re.compile(rf"^{_DAY}\s+and\s+{_DAY}\s+([A-Za-z]+)\b")),          # 14 and 15 May
+    ("day_month", re.compile(rf"^{_DAY}\s+(?:of\s+)?([A-Za-z]+)\b")),               # 5 July, 5 June (unofficial)
+    ("month_day", re.compile(r"^([A-Za-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\b")),      # July 5
+    ("bare_day", re.compile(r"^(\d{1,2})$")),                                     # 16 (month from next piece)
+]
+
+
+def _month_number(name: str):
+    """Month number of an English month name or abbreviation ("Sep", "Sept", "September"), None otherwise"""
+    name = name.lower()
+    for month, full in enumerate(_MONTH_NAMES, start=1):
+        if len(name) >= 3 and full.startswith(name):
+            return month
+    return None
+
+
+def _day_of_year(day: int, month: int) -> int:
+    if month is None or not 1 <= day <= DAYS_IN_MONTH[month - 1]:
+        return UNKNOWN_DAY
+    return int(MONTH_OFFSETS[month - 1]) + day
+
+
+def _parse_piece(piece: str):
+    """(format, [(day, month or None), ...]) for one '/'-separated piece of a cell"""
+    piece = piece.replace("\xa0", " ").strip()
+    for name, pattern in _FORMATS:
+        match = pattern.match(piece)
+        if match is None:
+            continue
+        if name == "dotted" or name == "day_month":
+            return name, [(int(match[1]), _month_number(match[2]))]
+        if name == "day_range":
+            month = _month_number(match[3])
+            return name, [(int(match[1]), month), (int(match[2]), month)]
+        if name == "month_day":
+            return name, [(int(match[2]), _month_number(match[1]))]
+        return name, [(int(match[1]), None)]
+    return "unparsed", []
+
+
+@lru_cache(maxsize=None)
+def parse_cell(text: str) -> tuple:
+    """Days-of-year in a date cell, in order, with unrecognised pieces left out"""
+    pieces = [_parse_piece(piece) for piece in text.split("/")] if text else []
+    days = []
+    pending = []                                # bare days waiting for the next piece's month
+    for name, dates in pieces:
+        if name == "bare_day":
+            pending += [day for day, _ in dates]
+            continue
+        month = dates[0][1] if dates else None
+        days += [_day_of_year(day, month) for day in pending]
+        pending = []
+        days += [_day_of_year(day, month) for day, month in dates]
+    return tuple(day for day in days if day != UNKNOWN_DAY)
+
+
+def explode_dates(raw: pd.DataFrame) -> pd.DataFrame:
+    """Long table of every parsed date: row (position in `raw`), source, position within the cell, day"""
+    parts = []
+    for source, column in SOURCES.items():
+        # Parse each distinct cell once
+        codes, cells = pd.factorize(raw[column].fillna(""))
+        parsed = pd.Series([list(parse_cell(cell)) for cell in cells], dtype=object)
+        days = parsed.iloc[codes].reset_index(drop=True).explode().dropna()
+        part = pd.DataFrame({"row": days.index, "source": source, "day": days.to_numpy(dtype=np.int64)})
+        part["position"] = part.groupby("row").cumcount()
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def choose_display_days(long: pd.DataFrame, rows: int, rule: str = "shared") -> np.ndarray:
+    """
+    Display day-of-year for each row (0 where it has no date).
+
+    Rules:
+      shared        first date listed in both columns (in national-day order),
+                    otherwise the first independence date, otherwise the first national date
+      independence  first independence date, otherwise the first national date
+      national      first national date, otherwise the first independence date
+      earliest      earliest date in the calendar year
+    """
+    if rule not in RULES:
+        raise ValueError(f"rule must be one of {RULES}, got {rule!r}")
+    long = long.copy()
+    if rule == "earliest":
+        keys = ["day"]
+    else:
+        preferred = "independence" if rule in ("shared", "independence") else "national"
+        long["rank"] = (long["source"] != preferred).astype(int)
+        keys = ["rank", "position"]
+        if rule == "shared":
+            sources = long.groupby(["row", "day"])["source"].transform("nunique")
+            long["not_shared"] = (sources < 2).astype(int)
+            # Shared dates are taken in national-day order
+            long.loc[long["not_shared"] == 0, "rank"] = (long["source"] != "national").astype(int)
+            keys = ["not_shared"] + keys
+    first = long.sort_values(["row"] + keys, kind="stable").drop_duplicates("row")
+    days = np.zeros(rows, dtype=np.int64)
+    days[first["row"].to_numpy()] = first["day"].to_numpy()
+    return days
+
+
+def apply_overrides(table: pd.DataFrame, overrides=OVERRIDES) -> pd.DataFrame:
+    """
+    Apply reviewed corrections: non-empty override cells replace the derived
+    values, and countries missing from `table` are inserted in name order.
+    """
+    fixes = pd.read_csv(overrides, dtype=str, keep_default_na=False).drop(columns="note", errors="ignore")
+    table = table.copy()
+    for _, fix in fixes.iterrows():
+        country = fix["Country"]
+        matches = (table["Country"] == country).to_numpy()
+        if not matches.any():
+            # Before the first row that sorts after the new country
+            later = (table["Country"] > country).to_numpy()
+            position = int(later.argmax()) if later.any() else len(table)
+            row = pd.DataFrame([{column: "" for column in table.columns} | {"Country": country}])
+            table = pd.concat([table.iloc[:position], row, table.iloc[position:]], ignore_index=True)
+            matches = (table["Country"] == country).to_numpy()
+        for column, value in fix.drop("Country").items():
+            if value != "":
+                table.loc[matches, column] = value
+    return table
+
+
+def normalize(raw: pd.DataFrame, rule: str = "shared", overrides=OVERRIDES, verbose: bool = True) -> pd.DataFrame:
+    """The updated table for a raw (scraped) table, rows in the raw table's order"""
+    table = raw.astype(str).reset_index(drop=True)
+    days = choose_display_days(explode_dates(table), len(table), rule)
+    table["Display Date"] = [display_date(day) if day else "" for day in days]
+    if overrides is not None:
+        table = apply_overrides(table, overrides)
+
+    for column in ("has_independence_day", "has_national_day"):
+        table[column] = np.where(table[column].str.upper() == "TRUE", "TRUE", "FALSE")
+    iso = iso_numeric_for_names(table["Country"])
+    keep = (~iso.isna() & (table["Display Date"] != "")).to_numpy()
+    if verbose and not keep.all():
+        print(f"Dropped {int((~keep).sum())} rows without an ISO code or a Gregorian date: "
+              + ", ".join(table.loc[~keep, "Country"]))
+
+    updated = table[keep].assign(**{"ISO Code": [f"{code:03d}" for code in iso[keep]]})
+    return updated[COLUMNS].reset_index(drop=True)
+
+
+def write_updated(updated: pd.DataFrame, path=UPDATED_PATH):
+    """Write in the layout of the existing file (CRLF, no final newline) so an unchanged table is a no-op diff"""
+    text = updated.to_csv(index=False, lineterminator="\r\n").removesuffix("\r\n")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def normalize_file(raw_path=RAW_PATH, updated_path=UPDATED_PATH, rule: str = "shared",
+                   overrides=OVERRIDES) -> pd.DataFrame:
+    """Read the raw CSV, normalize it and write the updated CSV"""
+    raw = pd.read_csv(raw_path, dtype=str, keep_default_na=False)
+    updated = normalize(raw, rule, overrides)
+    write_updated(updated, updated_path)
+    print(f"✓ Wrote {len(updated)} rows to {str(updated_path)!r}")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize the scraped CSV into the analysis CSV")
+    parser.add_argument("--input", default=RAW_PATH)
+    parser.add_argument("--output", default=UPDATED_PATH)
+    parser.add_argument("--rule", choices=RULES, default="shared", help="how the display date is chosen")
+    parser.add_argument("--no-overrides", action="store_true", help="ignore data/normalization_overrides.csv")
+    args = parser.parse_args()
+
+    normalize_file(args.input, args.output, args.rule, None if args.no_overrides else OVERRIDES)
@@ -0,0 +1,129 @@
+"""
+An editable index of celebrations by day of the year.
+
+`OverlapIndex` keeps, for each of the 367 day-of-year slots (0 = unknown),
+the celebrations on that day, and groups the known days into buckets by how
+many celebrations they hold. Adding, removing or re-dating a celebration
+moves one entry between two day slots and one day between two buckets, so
+every edit is O(1). Queries (who shares a date, which dates hold at least k
+celebrations, the overlap-size histogram) read the index directly instead of
+rescanning a frame.
+
+Entries are keyed by any hashable (the country name by default); loading a
+`HolidayDataset` keys them by row label, since a country may appear in more
+than one row.
+"""
+import numpy as np
+
+from dates import DAYS_IN_YEAR, UNKNOWN_DAY, display_date, parse_display_date
+
+
+def _day(date) -> int:
+    """Day-of-year of an int or a "DD.MMM" string"""
+    if isinstance(date, str):
+        return parse_display_date(date)
+    day = int(date)
+    if not UNKNOWN_DAY <= day <= DAYS_IN_YEAR:
+        raise ValueError(f"day of year must be in 0..{DAYS_IN_YEAR}, got {day}")
+    return day
+
+
+class OverlapIndex:
+    def __init__(self):
+        # Day slot ➜ {key: country}; dicts give O(1) removal and keep insertion order
+        self._by_day = [{} for _ in range(DAYS_IN_YEAR + 1)]
+        # Key ➜ (country, day)
+        self._entries = {}
+        # Celebrations per day ➜ known days with that many; every known day starts empty
+        self._days_by_size = [set(range(1, DAYS_IN_YEAR + 1))]
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Index every row of a `HolidayDataset`, keyed by row label"""
+        index = cls()
+        table = dataset.table
+        for key, country, day in zip(table.index, table['Country'], dataset.day_of_year.to_numpy()):
+            index.add(country, int(day), key=key)
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _move_day(self, day: int, old_size: int, new_size: int):
+        """Move a known day between size buckets"""
+        if day == UNKNOWN_DAY:
+            return
+        self._days_by_size[old_size].discard(day)
+        if new_size == len(self._days_by_size):
+            self._days_by_size.append(set())
+        self._days_by_size[new_size].add(day)
+        # Drop empty buckets at the top so the largest size stays accurate
+        while len(self._days_by_size) > 1 and not self._days_by_size[-1]:
+            self._days_by_size.pop()
+
+    def add(self, country: str, date, key=None):
+        """Add a celebration on `date` (day-of-year or "DD.MMM"); `key` defaults to the country"""
+        key = country if key is None else key
+        if key in self._entries:
+            raise KeyError(f"{key!r} is already indexed")
+        day = _day(date)
+        slot = self._by_day[day]
+        self._move_day(day, len(slot), len(slot) + 1)
+        slot[key] = country
+        self._entries[key] = (country, day)
+
+    def remove(self, key):
+        """Remove a celebration"""
+        country, day = self._entries.pop(key)
+        slot = self._by_day[day]
+        del slot[key]
+        self._move_day(day, len(slot) + 1, len(slot))
+
+    def redate(self, key, date):
+        """Move a celebration to another date"""
+        country, _ = self._entries[key]
+        self.remove(key)
+        self.add(country, date, key=key)
+
+    def date_of(self, key) -> int:
+        return self._entries[key][1]
+
+    def count(self, date) -> int:
+        """Celebrations on a date"""
+        return len(self._by_day[_day(date)])
+
+    def countries_on(self, date) -> list:
+        """Countries celebrating on a date, in the order they were added"""
+        return list(self._by_day[_day(date)].values())
+
+    def dates_with(self, k: int) -> list:
+        """Known days with exactly k celebrations, in calendar order"""
+        return sorted(self._days_by_size[k]) if k < len(self._days_by_size) else []
+
+    def dates_with_at_least(self, k: int) -> list:
+        """Known days with k or more celebrations, in calendar order"""
+        days = [day for bucket in self._days_by_size[max(k, 0):] for day in bucket]
+        return sorted(days)
+
+    def shared_dates(self, k: int = 2) -> dict:
+        """"DD.MMM" ➜ countries, for every known day with at least k celebrations"""
+        return {display_date(day): self.countries_on(day) for day in self.dates_with_at_least(k)}
+
+    @property
+    def max_overlap(self) -> int:
+        """Most celebrations on any known day"""
+        return len(self._days_by_size) - 1
+
+    def overlap_counts(self, sizes=None) -> dict:
+        """Days with exactly k celebrations, like `EmpiricalOverlaps.count_overlaps`"""
+        if sizes is None:
+            sizes = range(1, len(self._days_by_size))
+        return {k: len(self._days_by_size[k]) if k < len(self._days_by_size) else 0 for k in sizes}
+
+    @property
+    def occupancy(self) -> np.ndarray:
+        """Celebrations on each known day (index 0 = 1 January), for `windows.window_histogram`"""
+        return np.array([len(slot) for slot in self._by_day[UNKNOWN_DAY + 1:]], dtype=np.int64)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Structured timing traces of loading, processing and rendering.
+
+Tracing is off unless switched on from the environment, and costs one flag
+check per instrumented call when off:
+
+    HOLIDAYS_TRACE=trace.json python cli.py build-all       # nested spans ➜ trace.json
+    HOLIDAYS_PROFILE='Choropleth.*' python cli.py stats     # + cProfile of matching spans
+    HOLIDAYS_TRACEMALLOC=read_csv python cli.py stats       # + tracemalloc of matching spans
+    python profiling.py trace.json                          # print a trace as a tree
+
+`HOLIDAYS_PROFILE` and `HOLIDAYS_TRACEMALLOC` take comma-separated
+`fnmatch` patterns of span names and imply tracing (to `holidays_trace.json`
+unless `HOLIDAYS_TRACE` names a file). Profiles are saved next to the trace
+as `.prof` files (open with `pstats` or snakeviz) and their top functions
+are copied into the span; tracemalloc spans record their peak traced memory
+and top allocation sites.
+
+Each span records its start and duration, its thread, the process's peak
+RSS when it ended and, where the result (or the instance's dataset) has
+one, a row count. Spans opened inside another span on the same thread are
+nested under it. The trace is written when the process exits.
+
+`instrument(cls)` wraps every public method of a class (and `__init__`) in a
+span named "Class.method"; `traced(name)` does the same for a function and
+`span(name)` for a block.
+"""
+import asyncio
+import atexit
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+
+TRACE_VARIABLE = "HOLIDAYS_TRACE"
+PROFILE_VARIABLE = "HOLIDAYS_PROFILE"
+TRACEMALLOC_VARIABLE = "HOLIDAYS_TRACEMALLOC"
+DEFAULT_TRACE_FILE = "holidays_trace.json"
+TOP_ENTRIES = 10
+
+
+def _patterns(variable: str) -> list:
+    return [pattern.strip() for pattern in os.environ.get(variable, "").split(",") if pattern.strip()]
+
+
+def _peak_rss_mb():
+    """Peak resident set size of the process so far, in MB (None where unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _rows(result, owner=None):
+    """Row count of a result (frame, series, array, counts) or of the owner's dataset"""
+    for value in (result, getattr(owner, "dataset", None)):
+        if value is None:
+            continue
+        if hasattr(value, "shape") and getattr(value, "ndim", 0) >= 1:
+            return int(value.shape[0])
+        if isinstance(getattr(value, "rows", None), int):
+            return value.rows
+        if hasattr(value, "table") and hasattr(value, "version"):
+            return len(value)
+    return None
+
+
+class Tracer:
+    """Collects nested spans per thread and writes them as one JSON document"""
+    def __init__(self, path=None, profile=(), tracemalloc=()):
+        self.path = Path(path) if path else None
+        self.profile = list(profile)
+        self.tracemalloc = list(tracemalloc)
+        self.enabled = self.path is not None
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.spans = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiles = 0
+
+    @classmethod
+    def from_environment(cls):
+        profile, tracemalloc = _patterns(PROFILE_VARIABLE), _patterns(TRACEMALLOC_VARIABLE)
+        path = os.environ.get(TRACE_VARIABLE) or (DEFAULT_TRACE_FILE if profile or tracemalloc else None)
+        tracer = cls(path, profile, tracemalloc)
+        if tracer.enabled:
+            atexit.register(tracer.write)
+        return tracer
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _matches(self, name: str, patterns) -> bool:
+        return any(fnmatch(name, pattern) for pattern in patterns)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block as a span nested under the thread's current span"""
+        if not self.enabled:
+            yield {}
+            return
+        record = {"name": name, "start_ms": round((time.perf_counter() - self.started) * 1000, 3),
+                  "thread": threading.current_thread().name, **attributes, "children": []}
+        stack = self._stack()
+        if stack:
+            stack[-1]["children"].append(record)
+        else:
+            with self._lock:
+                self.spans.append(record)
+        stack.append(record)
+
+        profiler = self._start_profile(name)
+        tracing_memory = self._start_tracemalloc(name)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            if profiler is not None:
+                self._finish_profile(profiler, record)
+            if tracing_memory:
+                self._finish_tracemalloc(record)
+            record["peak_rss_mb"] = _peak_rss_mb()
+            if not record["children"]:
+                del record["children"]
+            stack.pop()
+
+    def _start_profile(self, name):
+        # One profiler per thread at a time: nested matching spans share the outer one
+        if not self._matches(name, self.profile) or getattr(self._local, "profiling", False):
+            return None
+        import cProfile
+
+        self._local.profiling = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _finish_profile(self, profiler, record):
+        import pstats
+
+        profiler.disable()
+        self._local.profiling = False
+        with self._lock:
+            self._profiles += 1
+            number = self._profiles
+        path = self.path.with_name(f"{self.path.stem}.{record['name']}.{number}.prof")
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_ENTRIES)
+        record["profile"] = {"file": str(path), "top": [line.rstrip() for line in out.getvalue().splitlines()
+                                                        if line.strip()][-TOP_ENTRIES:]}
+
+    def _start_tracemalloc(self, name) -> bool:
+        import tracemalloc
+
+        if not self._matches(name, self.tracemalloc) or tracemalloc.is_tracing():
+            return False
+        tracemalloc.start()
+        return True
+
+    def _finish_tracemalloc(self, record):
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ENTRIES]
+        tracemalloc.stop()
+        record["memory"] = {"peak_mb": round(peak / (1 << 20), 3), "retained_mb": round(current / (1 << 20), 3),
+                            "top": [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+                                    f"{stat.size / 1024:.1f} KiB in {stat.count} blocks" for stat in top]}
+
+    def trace(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "command": sys.argv,
+            "pid": os.getpid(),
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "peak_rss_mb": _peak_rss_mb(),
+            "spans": self.spans,
+        }
+
+    def write(self, path=None):
+        """Write the trace as JSON (to the configured path by default)"""
+        path = Path(path or self.path)
+        with self._lock:
+            path.write_text(json.dumps(self.trace(), indent=1, default=str) + "\n")
+        return path
+
+
+TRACER = Tracer.from_environment()
+
+
+def span(name: str, **attributes):
+    """Context manager timing a block on the process-wide tracer"""
+    return TRACER.span(name, **attributes)
+
+
+def traced(name: str = None):
+    """Decorator: run a function (or coroutine function) inside a span"""
+    def decorate(function):
+        label = name or function.__qualname__
+
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not TRACER.enabled:
+                    return await function(*args, **kwargs)
+                with TRACER.span(label) as record:
+                    result = await function(*args, **kwargs)
+                    record["rows"] = _rows(result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+            with TRACER.span(label) as record:
+                result = function(*args, **kwargs)
+                record["rows"] = _rows(result, args[0] if args else None)
+                return result
+        return wrapper
+    return decorate
+
+
+def instrument(cls):
+    """Wrap `__init__` and every public method, classmethod and staticmethod of `cls` in spans"""
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith("_") and attribute != "__init__":
+            continue
+        label = f"{cls.__name__}.{attribute}"
+        if isinstance(value, (classmethod, staticmethod)):
+            setattr(cls, attribute, type(value)(traced(label)(value.__func__)))
+        elif callable(value) and not isinstance(value, type):
+            setattr(cls, attribute, traced(label)(value))
+    return cls
+
+
+def _print_span(record: dict, depth: int = 0):
+    details = [f"{record['duration_ms']:10.1f} ms"]
+    if record.get("rows") is not None:
+        details.append(f"{record['rows']} rows")
+    if record.get("peak_rss_mb") is not None:
+        details.append(f"peak {record['peak_rss_mb']} MB")
+    if "memory" in record:
+        details.append(f"traced peak {record['memory']['peak_mb']} MB")
+    if "profile" in record:
+        details.append(record["profile"]["file"])
+    print(f"{'  ' * depth}{record['name']:<{max(48 - 2 * depth, 1)}} " + ", ".join(details))
+    for child in record.get("children", []):
+        _print_span(child, depth + 1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print a trace file as an indented tree of spans")
+    parser.add_argument("trace", nargs="?", default=DEFAULT_TRACE_FILE)
+    args = parser.parse_args()
+
+    trace = json.loads(Path(args.trace).read_text())
+    print(f"{' '.join(trace['command'])}  ({trace['duration_ms']:.0f} ms, peak {trace['peak_rss_mb']} MB)")
+    for record in trace["spans"]:
+        _print_span(record)
@@ -0,0 +1,127 @@
+"""
+Static image export through one long-lived kaleido browser.
+
+`fig.write_image` starts and tears down a headless browser on every call.
+`RenderService` instead opens a single kaleido session on a background event
+loop and reuses it for every export in the process. Rendered bytes are also
+cached on disk, keyed by a hash of the figure JSON plus the export options,
+so figures that have not changed are never rendered twice.
+"""
+import asyncio
+import atexit
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from profiling import span
+
+DEFAULT_CACHE_DIR = Path(".render_cache")
+
+
+class RenderService:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, tabs: int = 1):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.tabs = tabs
+        self._loop = None
+        self._thread = None
+        self._kaleido = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """Open the browser session on a background event loop (first use only)"""
+        with self._lock:
+            if self._kaleido is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="kaleido", daemon=True)
+            self._thread.start()
+            try:
+                self._kaleido = self._run(self._open())
+            except BaseException:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                raise
+            atexit.register(self.close)
+
+    async def _open(self):
+        import kaleido
+        browser = kaleido.Kaleido(n=self.tabs)
+        await browser.open()
+        return browser
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def cache_key(self, fig, format="png", scale=1, width=None, height=None) -> str:
+        """Hash of the figure JSON and export options"""
+        import plotly
+        import plotly.io as pio
+        
+        digest = hashlib.sha256()
+        digest.update(pio.to_json(fig, validate=False).encode())
+        digest.update(f"|{format}|{scale}|{width}|{height}|{plotly.__version__}".encode())
+        return digest.hexdigest()
+
+    def to_image(self, fig, format="png", scale=1, width=None, height=None) -> bytes:
+        """Render a figure to bytes, reusing the cached render when the figure is unchanged"""
+        import plotly.io as pio
+        
+        cached = None
+        if self.cache_dir is not None:
+            key = self.cache_key(fig, format, scale, width, height)
+            cached = self.cache_dir / f"{key}.{format}"
+            if cached.exists():
+                return cached.read_bytes()
+
+        self._start()
+        opts = dict(
+            format=format,
+            width=width or pio.defaults.default_width,
+            height=height or pio.defaults.default_height,
+            scale=scale,
+        )
+        with span("kaleido", format=format):
+            image = self._run(self._kaleido.calc_fig(fig.to_dict(), opts=opts))
+
+        if cached is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent processes never see a partial file
+            partial = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            partial.write_bytes(image)
+            partial.replace(cached)
+        return image
+
+    def write_image(self, fig, path, format=None, scale=1, width=None, height=None):
+        """Drop-in replacement for `fig.write_image` that goes through the shared session"""
+        path = Path(path)
+        format = format or path.suffix.lstrip(".") or "png"
+        with span("write_image", path=str(path), format=format):
+            path.write_bytes(self.to_image(fig, format=format, scale=scale, width=width, height=height))
+        return path
+
+    def close(self):
+        """Shut down the browser session and its event loop"""
+        with self._lock:
+            if self._kaleido is None:
+                return
+            self._run(self._kaleido.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._kaleido = None
+
+
+_service = None
+
+
+def get_render_service() -> RenderService:
+    """The process-wide render service"""
+    global _service
+    if _service is None:
+        _service = RenderService()
+    return _service
+
+
+def write_image(fig, path, **kwargs):
+    """Export a figure with the process-wide render service"""
+    return get_render_service().write_image(fig, path, **kwargs)
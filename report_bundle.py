@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+The whole analysis as one self-contained HTML file.
+
+    python report_bundle.py -o report.html              # every figure and statistics table, offline
+    python report_bundle.py -o report.html --gzip       # also report.html.gz
+    python cli.py report -o report.html --permutations 100000
+
+`write_image` or `write_html(include_plotlyjs=True)` per figure repeats the
+~4.6 MB plotly.js bundle in every file. Here plotly.js is inlined exactly
+once, followed by every figure of `cli.FIGURES` serialized compactly with
+orjson (plotly's typed-array encoding keeps numeric arrays as base64) into a
+single JSON block, and the season, hemisphere and overlap statistics as
+plain HTML tables. Figures are drawn as they scroll into view, so the page
+is readable before the last chart is plotted.
+
+plotly.js fetches map outlines (`world_110m.json`) from its CDN when a geo
+figure is drawn. Pages with maps instead carry the bundled Natural Earth
+110m boundaries as a quantized topojson with the layers plotly draws
+(countries keyed by ISO alpha-3, land, ocean and coastlines). They are
+preloaded into plotly's geo asset cache, so maps render without a network.
+
+The output depends only on the data and the plotly version (no timestamps),
+and the gzipped copy is written with a zero mtime, so rebuilding an
+unchanged report gives identical bytes.
+"""
+import argparse
+import gzip
+import html
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from cli import FIGURES, Report, statistics
+from countries import BOUNDARY_FILE, BOUNDARY_NAME_FIXES
+from dataset import DEFAULT_PATH, HolidayDataset
+
+TITLE = "Independence and National Days"
+# plotly.js's name for the world map at its default 1:110m resolution
+TOPOJSON_NAME = "world_110m"
+GEO_TRACES = {"choropleth", "scattergeo"}
+QUANTIZATION = 100_000
+
+_STYLE = """
+body { font-family: system-ui, sans-serif; margin: 2rem auto; max-width: 1100px; color: #222; }
+h1 { font-weight: 600; }
+.tables { display: flex; flex-wrap: wrap; gap: 2rem; }
+table { border-collapse: collapse; font-size: 0.9rem; }
+th, td { padding: 0.25rem 0.75rem; text-align: right; border-bottom: 1px solid #ddd; }
+th:first-child, td:first-child { text-align: left; }
+.figure { height: 520px; margin: 2rem 0; }
+footer { color: #888; font-size: 0.8rem; }
+"""
+
+# Preload any embedded map outlines, then draw each figure when it first comes into view
+_DRAW = """
+const geo = document.getElementById("geo-assets");
+if (geo) {
+  window.PlotlyGeoAssets = window.PlotlyGeoAssets || {topojson: {}};
+  Object.assign(window.PlotlyGeoAssets.topojson, JSON.parse(geo.textContent));
+}
+const figures = JSON.parse(document.getElementById("figure-data").textContent);
+const draw = (div) => {
+  const fig = figures[Number(div.dataset.figure)];
+  Plotly.newPlot(div, fig.data, fig.layout, {responsive: true, displaylogo: false}).then(() => {
+    if (fig.frames) Plotly.addFrames(div, fig.frames);
+  });
+};
+const divs = document.querySelectorAll("div.figure");
+if ("IntersectionObserver" in window) {
+  const observer = new IntersectionObserver((entries) => {
+    for (const entry of entries) {
+      if (entry.isIntersecting) { observer.unobserve(entry.target); draw(entry.target); }
+    }
+  }, {rootMargin: "200px"});
+  divs.forEach((div) => observer.observe(div));
+} else {
+  divs.forEach(draw);
+}
+"""
+
+
+def _heading(name: str) -> str:
+    return name.replace("_", " ").capitalize()
+
+
+def _script_json(text: str) -> str:
+    """JSON safe to embed in a <script> element"""
+    return text.replace("</", "<\\/")
+
+
+def _topology(objects: dict) -> dict:
+    """
+    Quantized topojson of `objects` (name ➜ [(geometry, id or None), ...]),
+    one delta-encoded arc per ring or line, no arcs shared
+    """
+    import numpy as np
+    import shapely
+
+    scale = (360 / (QUANTIZATION - 1), 180 / (QUANTIZATION - 1))
+    arcs = []
+
+    def arc(coords) -> int:
+        points = np.round((coords - (-180, -90)) / scale).astype(np.int64)
+        arcs.append(np.vstack([points[:1], np.diff(points, axis=0)]).tolist())
+        return len(arcs) - 1
+
+    def encode(geometry, id=None) -> dict:
+        if geometry.geom_type == "Polygon":
+            encoded = {"type": "Polygon", "arcs": [[arc(shapely.get_coordinates(ring))]
+                                                   for ring in [geometry.exterior, *geometry.interiors]]}
+        elif geometry.geom_type == "MultiPolygon":
+            encoded = {"type": "MultiPolygon", "arcs": [encode(part)["arcs"] for part in geometry.geoms]}
+        else:
+            encoded = {"type": "MultiLineString", "arcs": [[arc(shapely.get_coordinates(line))]
+                                                           for line in getattr(geometry, "geoms", [geometry])]}
+        return encoded if id is None else {**encoded, "id": id}
+
+    geometries = {name: {"type": "GeometryCollection", "geometries": [encode(*item) for item in items]}
+                  for name, items in objects.items()}
+    return {"type": "Topology", "transform": {"scale": list(scale), "translate": [-180, -90]},
+            "objects": geometries, "arcs": arcs}
+
+
+@lru_cache(maxsize=None)
+def world_topojson(boundary_file=BOUNDARY_FILE) -> bytes:
+    """
+    The bundled Natural Earth boundaries as plotly's world topojson (JSON
+    bytes). Exterior rings are clockwise, as plotly's d3 expects and as the
+    shapefile stores them.
+    """
+    import geopandas as gpd
+    import orjson
+    import shapely
+
+    world = gpd.read_file(boundary_file)
+    alpha3 = world["name"].map(BOUNDARY_NAME_FIXES).fillna(world["iso_a3"])
+    countries = [(shape, None if code == "-99" else code) for shape, code in zip(world.geometry.values, alpha3)]
+    land = shapely.orient_polygons(shapely.union_all(world.geometry.values), exterior_cw=True)
+    globe = shapely.segmentize(shapely.box(-180, -90, 180, 90), 1)
+    ocean = shapely.orient_polygons(shapely.difference(globe, land), exterior_cw=True)
+    return orjson.dumps(_topology({
+        "countries": countries,
+        "land": [(land, None)],
+        "ocean": [(ocean, None)],
+        "coastlines": [(land.boundary, None)],
+        # Layers plotly may draw (lakes, rivers, subunits) that this map leaves empty
+        "lakes": [], "rivers": [], "subunits": [],
+    }))
+
+
+def _uses_geo(fig) -> bool:
+    return any(trace.type in GEO_TRACES for trace in fig.data)
+
+
+def stats_tables(stats: dict) -> dict:
+    """Tables (title ➜ DataFrame) of the output of `cli.statistics`"""
+    tables = {
+        "Celebrations by season": pd.Series(stats["season_counts"], name="count").to_frame(),
+        "Celebrations by hemisphere": pd.Series(stats["hemisphere_counts"], name="count").to_frame(),
+        "Season by hemisphere": pd.DataFrame(stats["hemisphere_season"]).T,
+        "Days with exactly k celebrations": pd.Series(stats["overlap_counts"], name="days").rename_axis("k").to_frame(),
+    }
+    if "significance" in stats:
+        tables["Permutation tests"] = pd.DataFrame(stats["significance"]).T[["statistic", "p_value", "permutations"]]
+    return tables
+
+
+def figure_json(fig) -> str:
+    """Compact JSON of a figure (data, layout and any animation frames)"""
+    import plotly.io as pio
+
+    return pio.to_json(fig, validate=False, pretty=False, engine="orjson")
+
+
+def bundle(figures: dict, tables: dict, title: str = TITLE, footer: str = "") -> str:
+    """
+    One HTML page holding `tables` (title ➜ DataFrame) and `figures`
+    (name ➜ plotly figure), with plotly.js inlined once, and the world
+    topojson too if any figure is a map.
+    """
+    from plotly.offline import get_plotlyjs
+
+    parts = [
+        "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">",
+        f"<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\"><title>{html.escape(title)}</title>",
+        f"<style>{_STYLE}</style>",
+        f"<script>{get_plotlyjs()}</script>",
+        f"</head><body>\n<h1>{html.escape(title)}</h1>\n<section class=\"tables\">",
+    ]
+    for caption, table in tables.items():
+        parts.append(f"<div><h3>{html.escape(caption)}</h3>"
+                     f"{table.to_html(border=0, float_format=lambda value: f'{value:.4g}')}</div>")
+    parts.append("</section>")
+    for i, name in enumerate(figures):
+        parts.append(f"<h2>{html.escape(_heading(name))}</h2><div class=\"figure\" data-figure=\"{i}\"></div>")
+    # Figure JSON is joined as text: nothing is parsed and re-serialized
+    data = "[" + ",".join(figure_json(fig) for fig in figures.values()) + "]"
+    parts.append(f"<script type=\"application/json\" id=\"figure-data\">{_script_json(data)}</script>")
+    if any(_uses_geo(fig) for fig in figures.values()):
+        assets = '{"' + TOPOJSON_NAME + '":' + world_topojson().decode() + '}'
+        parts.append(f"<script type=\"application/json\" id=\"geo-assets\">{_script_json(assets)}</script>")
+    parts.append(f"<script>{_DRAW}</script>")
+    if footer:
+        parts.append(f"<footer>{html.escape(footer)}</footer>")
+    parts.append("</body></html>\n")
+    return "\n".join(parts)
+
+
+def write_report(page: str, path, compress: bool = False) -> list:
+    """Write the page, plus `<path>.gz` if `compress`; returns the written paths"""
+    path = Path(path)
+    data = page.encode("utf-8")
+    path.write_bytes(data)
+    paths = [path]
+    if compress:
+        compressed = path.with_name(path.name + ".gz")
+        # mtime=0 keeps the gzip header free of timestamps
+        compressed.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        paths.append(compressed)
+    return paths
+
+
+def build_report(report: Report, path, compress: bool = False, permutations: int = 0, seed: int = 0) -> list:
+    """Build every figure and statistic of `report` and write them as one HTML file"""
+    stats = statistics(report.counts, permutations, seed)
+    figures = {name: build(report) for name, build in FIGURES.items()}
+    page = bundle(figures, stats_tables(stats),
+                  footer=f"{stats['rows']} rows, dataset version {report.dataset.version}")
+    return write_report(page, path, compress)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle every figure and statistic into one offline HTML file")
+    parser.add_argument("--data", default=DEFAULT_PATH)
+    parser.add_argument("-o", "--output", type=Path, default=Path("report.html"))
+    parser.add_argument("--gzip", action="store_true", help="also write a gzipped copy")
+    parser.add_argument("--permutations", type=int, default=0, help="add permutation-test p-values")
+    args = parser.parse_args()
+
+    paths = build_report(Report(HolidayDataset.load(args.data)), args.output, args.gzip, args.permutations)
+    for path in paths:
+        print(f"✓ Wrote {str(path)!r} ({path.stat().st_size / 1e6:.1f} MB)")
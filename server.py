@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service for the statistics, lookups and figures.
+
+    python server.py                      # http://127.0.0.1:8050/
+    python server.py --port 9000 --workers 8
+
+The dataset is loaded once at startup and every statistic is precomputed, so
+stats and lookups are answered from memory. Responses are kept in an LRU
+cache keyed by path, each with an ETag; a request whose `If-None-Match`
+matches gets an empty 304. Building figures, serializing them and rendering
+images run on a thread pool (images through one shared `RenderService`), so
+the event loop keeps answering other requests meanwhile; concurrent requests
+for the same uncached figure share one build. Calendar feeds (9 MB for all
+countries) are not cached: each request streams its feed from a worker
+thread straight to the socket with chunked transfer encoding.
+
+Endpoints (GET or HEAD):
+
+    /stats                      everything below in one document
+    /stats/seasons              /stats/hemispheres   /stats/months   /stats/overlaps
+    /dates/<DD.MMM or 1-366>    countries celebrating on a date
+    /countries/<name>           a country's date(s), seasons and who shares them
+    /figures                    figure names
+    /figures/<name>.json        plotly figure JSON
+    /figures/<name>.png|svg     rendered image (503 if no renderer is available)
+    /calendars/<name>.ics       iCalendar feed of a country (or "all"), 1900-2100
+    /health
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Callable, NamedTuple
+from urllib.parse import unquote, urlsplit
+
+import orjson
+
+from cli import FIGURES, Report, statistics
+from dataset import DEFAULT_PATH, HolidayDataset
+from dates import DAYS_IN_YEAR, UNKNOWN_DAY, display_date, parse_display_date
+from overlap_index import OverlapIndex
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8050
+CACHE_SIZE = 1024
+IMAGE_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class Response(NamedTuple):
+    status: int
+    content_type: str
+    body: bytes
+    etag: str
+
+
+class Stream(NamedTuple):
+    """A response written by `write(sink)` on the worker pool, as it is generated"""
+    status: int
+    content_type: str
+    write: Callable
+
+
+def make_response(body: bytes, content_type: str, status: int = 200) -> Response:
+    return Response(status, content_type, body, f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"')
+
+
+def json_response(payload, status: int = 200) -> Response:
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return make_response(body, "application/json", status)
+
+
+def error_response(status: int, message: str) -> Response:
+    return json_response({"error": message}, status)
+
+
+class ResponseCache:
+    """Least-recently-used responses by path"""
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._responses = OrderedDict()
+
+    def get(self, path: str):
+        response = self._responses.get(path)
+        if response is not None:
+            self._responses.move_to_end(path)
+        return response
+
+    def put(self, path: str, response: Response):
+        self._responses[path] = response
+        self._responses.move_to_end(path)
+        while len(self._responses) > self.size:
+            self._responses.popitem(last=False)
+
+
+class HolidayService:
+    """Routes requests to precomputed statistics, lookups and figures over one dataset"""
+    def __init__(self, dataset: HolidayDataset, workers: int = 4, cache_size: int = CACHE_SIZE):
+        self.report = Report(dataset)
+        self.cache = ResponseCache(cache_size)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="figures")
+        self._renderer = None
+        self._pending = {}                      # path ➜ future of an uncached build in progress
+        self._precompute()
+
+    def _precompute(self):
+        """Load everything the stats and lookup endpoints read, once"""
+        report = self.report
+        df = report.choropleth.df
+        self.index = OverlapIndex.from_dataset(report.dataset)
+        months = df.loc[df['month'] > 0, 'month'].value_counts().sort_index()
+        stats = statistics(report.counts)
+        self.stats = {
+            "seasons": stats["season_counts"],
+            "hemispheres": {"counts": stats["hemisphere_counts"], "by_season": stats["hemisphere_season"]},
+            "months": {int(month): int(count) for month, count in months.items()},
+            "overlaps": {"n": report.overlaps.n, "counts": stats["overlap_counts"],
+                         "shared_dates": self.index.shared_dates(2)},
+        }
+        # Lower-cased country name ➜ row labels
+        self.countries = {}
+        for key, country in df['Country'].items():
+            self.countries.setdefault(country.lower(), []).append(key)
+        for name, payload in [("/stats", {"rows": stats["rows"], **self.stats}),
+                              *((f"/stats/{name}", payload) for name, payload in self.stats.items())]:
+            self.cache.put(name, json_response(payload))
+
+    async def handle(self, path: str):
+        """Response for a GET of `path`, from the cache when possible"""
+        response = self.cache.get(path)
+        if response is not None:
+            return response
+        if path in self._pending:
+            return await asyncio.shield(self._pending[path])
+        future = asyncio.get_running_loop().create_future()
+        self._pending[path] = future
+        try:
+            response = await self._route(path)
+            # Errors are not cached, so a failed render is retried on the next request; streams never are
+            if response.status == 200 and isinstance(response, Response):
+                self.cache.put(path, response)
+            future.set_result(response)
+            return response
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()                  # retrieved; waiters re-raise it
+            raise
+        finally:
+            del self._pending[path]
+
+    async def _route(self, path: str):
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts == ["health"]:
+            return json_response({"status": "ok", "version": self.report.dataset.version})
+        if parts == [""]:
+            return json_response({"endpoints": ["/stats", *(f"/stats/{name}" for name in self.stats),
+                                                "/dates/<DD.MMM>", "/countries/<name>", "/figures",
+                                                "/calendars/<name>.ics"]})
+        if parts == ["figures"]:
+            return json_response({"figures": list(FIGURES), "formats": ["json", *IMAGE_FORMATS]})
+        if len(parts) == 2 and parts[0] == "dates":
+            return self.date_lookup(parts[1])
+        if len(parts) == 2 and parts[0] == "countries":
+            return self.country_lookup(parts[1])
+        if len(parts) == 2 and parts[0] == "calendars" and parts[1].endswith(".ics"):
+            name = parts[1].removesuffix(".ics")
+            if name != "all" and name.lower() not in self.countries:
+                return error_response(404, f"no country {name!r}")
+            return self.calendar_feed(name)
+        if len(parts) == 2 and parts[0] == "figures":
+            name, _, format = parts[1].rpartition(".")
+            if name not in FIGURES or format not in ("json", *IMAGE_FORMATS):
+                return error_response(404, f"no figure {parts[1]!r}")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, self.figure_payload, name, format)
+        return error_response(404, f"no endpoint {path!r}")
+
+    def date_lookup(self, text: str) -> Response:
+        # str.isdigit alone accepts non-ASCII digits such as "²", which int() rejects
+        day = int(text) if text.isascii() and text.isdigit() else parse_display_date(text)
+        if not 1 <= day <= DAYS_IN_YEAR:
+            return error_response(400, f"expected a DD.MMM date or a day of the year, got {text!r}")
+        countries = self.index.countries_on(day)
+        return json_response({"date": display_date(day), "day_of_year": day, "count": len(countries),
+                              "countries": countries})
+
+    def country_lookup(self, name: str) -> Response:
+        keys = self.countries.get(name.lower())
+        if keys is None:
+            return error_response(404, f"no country {name!r}")
+        df = self.report.choropleth.df
+        entries = []
+        for key in keys:
+            row = df.loc[key]
+            day = self.index.date_of(key)
+            shared = [country for country in self.index.countries_on(day) if country != row['Country']] \
+                if day != UNKNOWN_DAY else []
+            entries.append({
+                "country": row['Country'],
+                "display_date": row['Display Date'],
+                "day_of_year": day,
+                "iso_3": row['ISO_3'],
+                "hemisphere": row['hemisphere'],
+                "season": row['season'],
+                "local_season": row['local_season'],
+                "shares_date_with": shared,
+            })
+        return json_response(entries)
+
+    def figure_payload(self, name: str, format: str) -> Response:
+        """Build (memoized) and serialize or render a figure; runs on the worker pool"""
+        fig = FIGURES[name](self.report)
+        if format == "json":
+            return make_response(fig.to_json(validate=False).encode(), "application/json")
+        try:
+            image = self.renderer.to_image(fig, format=format, scale=2)
+        except Exception as error:
+            return error_response(503, f"rendering unavailable: {type(error).__name__}: {error}")
+        return make_response(image, IMAGE_FORMATS[format])
+
+    def calendar_feed(self, name: str) -> Stream:
+        """iCalendar feed of one country or of all of them, streamed by `write_ics`"""
+        from ics_export import iter_ics, write_ics
+        
+        countries = None if name == "all" else [name]
+        return Stream(200, "text/calendar; charset=utf-8",
+                      lambda sink: write_ics(iter_ics(self.feed_frame, countries=countries,
+                                                      name=f"{name} holidays"), sink))
+
+    @cached_property
+    def feed_frame(self):
+        """Table for the calendar feeds, built on the first feed request (on the worker pool)"""
+        from ics_export import feed_frame
+
+        return feed_frame(self.report.dataset)
+
+    @property
+    def renderer(self):
+        if self._renderer is None:
+            from render import get_render_service
+            self._renderer = get_render_service()
+        return self._renderer
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _write_response(writer, response: Response, head_only: bool, not_modified: bool, keep_alive: bool):
+    status = 304 if not_modified else response.status
+    body = b"" if head_only or not_modified else response.body
+    length = 0 if not_modified else len(response.body)
+    headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+               f"Content-Type: {response.content_type}",
+               f"Content-Length: {length}",
+               f"ETag: {response.etag}",
+               "Cache-Control: no-cache",
+               f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+
+
+class _SocketSink:
+    """
+    Binary file-like sink for a worker thread: each write is sent (as one
+    chunk if `chunked`) on the event loop, and blocks until the writer has
+    drained, so a slow client slows the producer instead of filling memory.
+    """
+    def __init__(self, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop, chunked: bool):
+        self.writer = writer
+        self.loop = loop
+        self.chunked = chunked
+
+    async def _send(self, data: bytes):
+        self.writer.write(b"%x\r\n%s\r\n" % (len(data), data) if self.chunked else data)
+        await self.writer.drain()
+
+    def write(self, data: bytes):
+        if data:
+            asyncio.run_coroutine_threadsafe(self._send(data), self.loop).result()
+
+
+async def _write_stream(writer, pool, stream: Stream, head_only: bool, chunked: bool, keep_alive: bool):
+    """Send a streamed response: chunked for HTTP/1.1, otherwise delimited by closing the connection"""
+    headers = [f"HTTP/1.1 {stream.status} {REASONS.get(stream.status, '')}",
+               f"Content-Type: {stream.content_type}",
+               *(["Transfer-Encoding: chunked"] if chunked else []),
+               "Cache-Control: no-cache",
+               f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode())
+    await writer.drain()
+    if head_only:
+        return
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(pool, stream.write, _SocketSink(writer, loop, chunked))
+    if chunked:
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def handle_connection(service: HolidayService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Serve HTTP/1.1 requests on one connection until the client closes it"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = request_line.split(" ")
+            except ValueError:
+                await _write_response(writer, error_response(400, "malformed request line"), False, False, False)
+                return
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            # Request bodies are not used by any endpoint, but must be consumed to keep the connection in sync
+            length = headers.get("content-length") or "0"
+            if not (length.isascii() and length.isdigit()):
+                await _write_response(writer, error_response(400, f"malformed Content-Length {length!r}"),
+                                      False, False, False)
+                return
+            if int(length):
+                try:
+                    await reader.readexactly(int(length))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            if method not in ("GET", "HEAD"):
+                response = error_response(405, f"method {method} not allowed")
+            else:
+                try:
+                    response = await service.handle(urlsplit(target).path)
+                except Exception as error:
+                    response = error_response(500, f"{type(error).__name__}: {error}")
+            if isinstance(response, Stream):
+                # Without chunked encoding (HTTP/1.0) the end of the body is the end of the connection
+                chunked = version == "HTTP/1.1"
+                keep_alive = keep_alive and chunked
+                try:
+                    await _write_stream(writer, service.pool, response, method == "HEAD", chunked, keep_alive)
+                except Exception:
+                    # Headers are already sent: dropping the connection marks the body as incomplete
+                    return
+            else:
+                not_modified = response.status == 200 and headers.get("if-none-match") == response.etag
+                await _write_response(writer, response, method == "HEAD", not_modified, keep_alive)
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def serve(service: HolidayService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    address = server.sockets[0].getsockname()
+    print(f"✓ Serving on http://{address[0]}:{address[1]}/", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve statistics, lookups and figures over HTTP")
+    parser.add_argument("--data", default=DEFAULT_PATH, help="CSV of independence and national days")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4, help="threads building and rendering figures")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="responses kept in the LRU cache")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    service = HolidayService(HolidayDataset.load(args.data), args.workers, args.cache_size)
+    print(f"✓ Loaded and precomputed {len(service.report.dataset)} rows in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Monte Carlo simulation of how holidays pile up on the same day when each
+country picks its day uniformly at random, and permutation tests of the
+season, hemisphere and calendar patterns.
+
+Both run in fixed-size chunks of trials, each with its own child seed spawned
+from one `SeedSequence`, so results are reproducible and independent of the
+number of worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from dates import DAYS_IN_MONTH, DAYS_IN_YEAR, MONTH_BY_DAY, SEASON_BY_DAY, UNKNOWN_DAY
+from profiling import instrument
+
+# Upper bound on the number of random draws held in memory at once per worker
+_DRAWS_PER_BATCH = 4_000_000
+# Fewest shuffles per batch for which stepping Fisher-Yates column by column pays off
+_MIN_VECTOR_ROWS = 1024
+
+
+def _run_chunks(function, args, workers: int) -> list:
+    """`function(*a)` for each tuple in `args`, over a process pool unless one worker (or chunk) suffices"""
+    if workers == 1 or len(args) == 1:
+        return [function(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+        return list(pool.map(function, *zip(*args)))
+
+
+def _chunk_sizes(trials: int, chunk_size: int) -> list:
+    return [min(chunk_size, trials - start) for start in range(0, trials, chunk_size)]
+
+
+def _simulate_chunk(n, days, trials, max_k, seed_sequence):
+    """Run one chunk of trials and return its (max_k + 1, days + 1) count histogram"""
+    rng = np.random.default_rng(seed_sequence)
+    histogram = np.zeros((max_k + 1, days + 1), dtype=np.int64)
+    batch = max(1, _DRAWS_PER_BATCH // max(n, days))
+    k_offsets = np.arange(max_k + 1) * (days + 1)
+
+    for start in range(0, trials, batch):
+        rows = min(batch, trials - start)
+        row_index = np.arange(rows)[:, None]
+        # Each trial row gets its own block of `days` bins, so one bincount
+        # computes the occupancy of every day for the whole batch
+        draws = rng.integers(0, days, size=(rows, n), dtype=np.int64)
+        draws += row_index * days
+        occupancy = np.bincount(draws.ravel(), minlength=rows * days).reshape(rows, days)
+        np.minimum(occupancy, max_k, out=occupancy)
+        # Number of days with exactly k celebrations, per trial row
+        occupancy += row_index * (max_k + 1)
+        days_with_k = np.bincount(occupancy.ravel(), minlength=rows * (max_k + 1)).reshape(rows, max_k + 1)
+        # Fold the rows into the histogram of (k, number of days with k)
+        days_with_k += k_offsets
+        histogram += np.bincount(days_with_k.ravel(), minlength=histogram.size).reshape(histogram.shape)
+
+    return histogram
+
+
+class MonteCarloOverlaps:
+    """
+    Simulated distribution of the number of days that carry exactly k
+    celebrations when n countries are dropped uniformly onto `days` days.
+
+    Trials are split into fixed-size chunks, each with its own child seed
+    spawned from `seed`, so results do not depend on the number of workers.
+    The last bin, `max_k`, collects days with `max_k` or more celebrations;
+    asking for any k above it reads that bin.
+    """
+    def __init__(self, n: int, days: int = 365, trials: int = 1_000_000, max_k: int = 10,
+                 seed: int = 0, workers: int = None, chunk_size: int = 50_000):
+        self.n = n
+        self.days = days
+        self.trials = trials
+        self.max_k = max_k
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.histogram = None
+
+    @property
+    def figure_key(self):
+        """Seeded simulations are reproducible, so figures using them can be cached"""
+        if not isinstance(self.seed, int):
+            return None
+        return (self.n, self.days, self.trials, self.max_k, self.seed)
+
+    def run(self):
+        """Run the simulation (once) and return the (k, days-with-k) histogram"""
+        if self.histogram is not None:
+            return self.histogram
+
+        chunk_sizes = _chunk_sizes(self.trials, self.chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+        args = [(self.n, self.days, size, self.max_k, seed) for size, seed in zip(chunk_sizes, seeds)]
+        self.histogram = np.sum(_run_chunks(_simulate_chunk, args, self.workers), axis=0)
+        return self.histogram
+
+    def _bins(self, k=None) -> np.ndarray:
+        """Histogram rows for k (k >= max_k all read the max_k-or-more bin)"""
+        return np.arange(self.max_k + 1) if k is None else np.minimum(np.asarray(k), self.max_k)
+
+    def distribution(self, k: int) -> pd.Series:
+        """Probability of each possible number of days with exactly k celebrations"""
+        histogram = self.run()
+        return pd.Series(histogram[self._bins(k)] / self.trials, name=k)
+
+    def mean(self, k=None) -> np.ndarray:
+        """Mean number of days with exactly k celebrations"""
+        histogram = self.run()
+        return (histogram[self._bins(k)] @ np.arange(self.days + 1)) / self.trials
+
+    def percentiles(self, k=None, q=(2.5, 50, 97.5)) -> pd.DataFrame:
+        """Percentiles of the number of days with exactly k celebrations (rows k, columns q)"""
+        histogram = self.run()
+        k = np.arange(self.max_k + 1) if k is None else np.asarray(k)
+        cdf = np.cumsum(histogram[self._bins(k)], axis=1) / self.trials
+        values = {p: (cdf < p / 100).sum(axis=1) for p in q}
+        return pd.DataFrame(values, index=pd.Index(k, name='k'))
+
+
+class PermutationResult(NamedTuple):
+    test: str
+    statistic: float
+    p_value: float
+    permutations: int
+
+
+def _chi_square(tables: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """Pearson chi-square of each table in a (..., cells) stack against fixed expected counts"""
+    used = expected > 0
+    return (((tables[..., used] - expected[used]) ** 2) / expected[used]).sum(axis=-1)
+
+
+def _partial_shuffle(rng, labels: np.ndarray, k: int, rows: int) -> np.ndarray:
+    """
+    First k entries of `rows` independent uniform shuffles of `labels`, as a
+    (k, rows) array: k steps of Fisher-Yates, each vectorized over the rows.
+    Shuffles are stored column-wise so every step touches contiguous memory.
+    """
+    n = len(labels)
+    if rows < _MIN_VECTOR_ROWS:
+        # Long label arrays leave few shuffles per batch: shuffle whole rows instead of stepping k times
+        return rng.permuted(np.broadcast_to(labels, (rows, n)), axis=1)[:, :k].T
+    shuffled = np.repeat(labels[:, None], rows, axis=1)
+    flat = shuffled.reshape(-1)
+    columns = np.arange(rows)
+    for i in range(k):
+        j = rng.integers(i, n, size=rows) * rows + columns
+        swap = flat[j]
+        flat[j] = shuffled[i]
+        shuffled[i] = swap
+    return shuffled[:k]
+
+
+def _season_hemisphere_chunk(labels, segment, totals, expected, observed, trials, seed_sequence):
+    """
+    Permutations (of one chunk) whose chi-square reaches `observed`.
+
+    Rows are ordered by hemisphere group with the largest group last, so only
+    the leading `len(segment)` labels of each shuffle are drawn and counted;
+    the last group's row of the table is the column totals minus the others.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    groups, seasons = expected.shape
+    k = len(segment)
+    batch = max(1, _DRAWS_PER_BATCH // len(labels))
+    exceed = 0
+    for start in range(0, trials, batch):
+        rows = min(batch, trials - start)
+        # Cell of each drawn label, offset into its permutation's own block of cells
+        cells = (segment * seasons)[:, None] + _partial_shuffle(rng, labels, k, rows)
+        cells = cells + np.arange(rows) * ((groups - 1) * seasons)
+        head = np.bincount(cells.ravel(), minlength=rows * (groups - 1) * seasons).reshape(rows, groups - 1, seasons)
+        tables = np.concatenate([head, (totals - head.sum(axis=1))[:, None, :]], axis=1)
+        exceed += np.count_nonzero(_chi_square(tables.reshape(rows, -1), expected.ravel()) >= observed)
+    return exceed
+
+
+# Angle of each day-of-year slot (index 0 = 1 January) on the circle
+_ANGLES = 2 * np.pi * (np.arange(DAYS_IN_YEAR) + 0.5) / DAYS_IN_YEAR
+_COS, _SIN = np.cos(_ANGLES), np.sin(_ANGLES)
+_MONTH_INDEX = (MONTH_BY_DAY[1:] - 1).astype(np.intp)
+_MONTH_SHARE = DAYS_IN_MONTH / DAYS_IN_YEAR
+
+
+def _rayleigh(days: np.ndarray) -> np.ndarray:
+    """Mean resultant length of day indices (0-365) along the last axis"""
+    return np.hypot(_COS[days].sum(axis=-1), _SIN[days].sum(axis=-1)) / days.shape[-1]
+
+
+def _uniformity_chunk(n, observed_rayleigh, observed_months, trials, seed_sequence):
+    """Samples of n uniform days (of one chunk) whose Rayleigh R and month chi-square reach the observed ones"""
+    rng = np.random.default_rng(seed_sequence)
+    batch = max(1, _DRAWS_PER_BATCH // n)
+    expected = n * _MONTH_SHARE
+    exceed = np.zeros(2, dtype=np.int64)
+    for start in range(0, trials, batch):
+        rows = min(batch, trials - start)
+        days = rng.integers(0, DAYS_IN_YEAR, size=(rows, n), dtype=np.uint16)
+        exceed[0] += np.count_nonzero(_rayleigh(days) >= observed_rayleigh)
+        # Month of every draw, offset into its sample's own block of 12 so one bincount counts all samples
+        months = _MONTH_INDEX[days] + 12 * np.arange(rows)[:, None]
+        counts = np.bincount(months.ravel(), minlength=rows * 12).reshape(rows, 12)
+        exceed[1] += np.count_nonzero(_chi_square(counts, expected) >= observed_months)
+    return exceed
+
+
+class PermutationTests:
+    """
+    Significance of the season and calendar patterns.
+
+    * `season_hemisphere`: is the (Northern calendar) season independent of
+      the hemisphere? Season labels are shuffled across rows and the
+      hemisphere x season chi-square recomputed for every permutation, with
+      the crosstabs of a whole batch counted by one `bincount`.
+    * `uniformity`: are the days spread uniformly over the year? The Rayleigh
+      mean resultant length (one dominant time of year) and the month
+      chi-square (months weighted by length) are compared against samples of
+      uniform days on the 366-slot calendar.
+
+    p-values are (1 + trials at least as extreme) / (1 + trials). Labels are
+    integer codes as in `dates` (hemisphere 1-2, season 1-4, day 1-366; 0 is
+    unknown and left out).
+    """
+    def __init__(self, permutations: int = 1_000_000, seed: int = 0, workers: int = None,
+                 chunk_size: int = 50_000):
+        self.permutations = permutations
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def _run(self, function, *args) -> list:
+        """Run `function(*args, trials, seed)` over the chunks of `permutations`"""
+        chunk_sizes = _chunk_sizes(self.permutations, self.chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+        return _run_chunks(function, [(*args, size, seed) for size, seed in zip(chunk_sizes, seeds)], self.workers)
+
+    def _p_value(self, exceed) -> float:
+        return (1 + int(exceed)) / (1 + self.permutations)
+
+    def season_hemisphere(self, hemisphere_code, day_of_year) -> PermutationResult:
+        """Chi-square test of hemisphere x season independence"""
+        hemisphere = np.asarray(hemisphere_code, dtype=np.intp)
+        day = np.asarray(day_of_year, dtype=np.intp)
+        known = (hemisphere > 0) & (day != UNKNOWN_DAY)
+        hemisphere, season = hemisphere[known], SEASON_BY_DAY[day[known]].astype(np.intp) - 1
+
+        groups, group_of = np.unique(hemisphere, return_inverse=True)
+        if len(groups) < 2:
+            return PermutationResult("season_hemisphere", 0.0, 1.0, self.permutations)
+        # Largest group last: its row of the crosstab is derived, never drawn
+        rank = np.argsort(np.argsort(np.bincount(group_of), kind='stable'), kind='stable')
+        group_of = rank[group_of]
+        order = np.argsort(group_of, kind='stable')
+        group_of, season = group_of[order], season[order]
+
+        seasons = 4
+        table = np.bincount(group_of * seasons + season, minlength=len(groups) * seasons).reshape(len(groups), seasons)
+        totals = table.sum(axis=0)
+        expected = np.outer(table.sum(axis=1), totals) / table.sum()
+        observed = float(_chi_square(table.ravel().astype(float), expected.ravel()))
+        segment = group_of[group_of < len(groups) - 1]
+
+        # Allow for rounding when comparing permuted statistics with the observed one
+        exceed = sum(self._run(_season_hemisphere_chunk, season.astype(np.int8), segment, totals, expected,
+                               observed * (1 - 1e-9)))
+        return PermutationResult("season_hemisphere", observed, self._p_value(exceed), self.permutations)
+
+    def uniformity(self, day_of_year) -> dict:
+        """Rayleigh and month chi-square tests of uniformity over the year"""
+        day = np.asarray(day_of_year, dtype=np.intp)
+        index = day[day != UNKNOWN_DAY] - 1
+        n = len(index)
+        rayleigh = float(_rayleigh(index))
+        months = float(_chi_square(np.bincount(_MONTH_INDEX[index], minlength=12).astype(float), n * _MONTH_SHARE))
+        exceed = np.sum(self._run(_uniformity_chunk, n, rayleigh * (1 - 1e-9), months * (1 - 1e-9)), axis=0)
+        return {
+            "rayleigh": PermutationResult("rayleigh", rayleigh, self._p_value(exceed[0]), self.permutations),
+            "month_uniformity": PermutationResult("month_uniformity", months, self._p_value(exceed[1]),
+                                                  self.permutations),
+        }
+
+    def all(self, hemisphere_code, day_of_year) -> dict:
+        """Every test, by name"""
+        return {"season_hemisphere": self.season_hemisphere(hemisphere_code, day_of_year),
+                **self.uniformity(day_of_year)}
+
+
+for _cls in (MonteCarloOverlaps, PermutationTests):
+    instrument(_cls)
@@ -0,0 +1,149 @@
+"""
+Columnar snapshots of processed data frames.
+
+Parsing the CSV and deriving ISO codes, hemispheres and seasons is repeated
+by every process that builds a `Choropleth` or `EmpiricalOverlaps`. A
+snapshot stores the processed frame as one `.npy` file per column, next to
+the CSV, and later loads map those files into memory instead of recomputing.
+Snapshots are keyed by the SHA-256 of the CSV contents (plus
+`SNAPSHOT_VERSION`), so editing the CSV invalidates them automatically.
+
+Numeric and boolean columns are memory-mapped without copying. String
+columns are stored as integer codes plus a JSON list of labels.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Bump when the processing that produces snapshotted frames changes
+SNAPSHOT_VERSION = 4
+SNAPSHOT_DIR_NAME = ".snapshots"
+
+# Nullable extension arrays by numpy kind of their values
+_MASKED_ARRAYS = {
+    "i": pd.arrays.IntegerArray,
+    "u": pd.arrays.IntegerArray,
+    "f": pd.arrays.FloatingArray,
+    "b": pd.arrays.BooleanArray,
+}
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_column(directory, position, series):
+    """Write one column and return its schema entry"""
+    name = f"{position:03d}"
+    entry = {"name": series.name, "file": name}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        entry["kind"] = "category"
+        entry["categories"] = series.cat.categories.tolist()
+        entry["ordered"] = bool(series.cat.ordered)
+        np.save(directory / f"{name}.npy", series.cat.codes.to_numpy())
+    elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and hasattr(series.array, "_mask"):
+        # Nullable integer / boolean columns: values plus a missing-value mask
+        entry["kind"] = "masked"
+        entry["dtype"] = str(series.dtype)
+        np.save(directory / f"{name}.npy", series.array._data)
+        np.save(directory / f"{name}.mask.npy", series.array._mask)
+    elif series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+        entry["kind"] = "object"
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        entry["categories"] = [None if pd.isna(u) else u for u in uniques.tolist()]
+        np.save(directory / f"{name}.npy", codes.astype(np.int32))
+    else:
+        entry["kind"] = "numpy"
+        np.save(directory / f"{name}.npy", series.to_numpy())
+    return entry
+
+
+def _map(path):
+    """Memory-map a .npy file as a plain (read-only) ndarray"""
+    return np.load(path, mmap_mode="r").view(np.ndarray)
+
+
+def _read_column(directory, entry):
+    """Load one column described by its schema entry"""
+    values = _map(directory / f"{entry['file']}.npy")
+    kind = entry["kind"]
+    if kind == "category":
+        dtype = pd.CategoricalDtype(entry["categories"], ordered=entry["ordered"])
+        return pd.Categorical.from_codes(values, dtype=dtype)
+    if kind == "masked":
+        mask = _map(directory / f"{entry['file']}.mask.npy")
+        return _MASKED_ARRAYS[pd.api.types.pandas_dtype(entry["dtype"]).kind](values, mask)
+    if kind == "object":
+        labels = np.empty(len(entry["categories"]) + 1, dtype=object)
+        labels[:-1] = entry["categories"]
+        labels[-1] = np.nan                         # code -1 ➜ missing
+        return labels[values]
+    return values
+
+
+def write_snapshot(df: pd.DataFrame, directory) -> None:
+    """Write `df` as a columnar snapshot directory (atomically replacing any existing one)"""
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+    try:
+        columns = [_write_column(staging, i, df[column]) for i, column in enumerate(df.columns)]
+        np.save(staging / "index.npy", df.index.to_numpy())
+        (staging / "schema.json").write_text(json.dumps({"columns": columns, "rows": len(df)}))
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            # Another process published the same snapshot first
+            shutil.rmtree(staging, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def read_snapshot(directory) -> pd.DataFrame:
+    """Load a snapshot directory written by `write_snapshot`"""
+    directory = Path(directory)
+    schema = json.loads((directory / "schema.json").read_text())
+    index = pd.Index(_map(directory / "index.npy"), copy=False)
+    columns = {entry["name"]: _read_column(directory, entry) for entry in schema["columns"]}
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def load_cached(path_to_data, name: str, build, digest: str = None) -> pd.DataFrame:
+    """
+    Return `build(path_to_data)`, served from a snapshot when one exists for
+    the current contents of `path_to_data`.
+
+    `name` distinguishes the different processed frames built from one CSV;
+    `digest` may be passed when the caller has already hashed the file.
+    """
+    path = Path(path_to_data)
+    root = path.parent / SNAPSHOT_DIR_NAME
+    key = f"{(digest or file_digest(path))[:16]}-v{SNAPSHOT_VERSION}"
+    directory = root / f"{path.stem}.{name}.{key}"
+    if (directory / "schema.json").exists():
+        return read_snapshot(directory)
+
+    df = build(path_to_data)
+    # Drop snapshots of older versions of the same file; the current one may
+    # have just been published (and be mapped) by a concurrent process
+    for stale in root.glob(f"{path.stem}.{name}.*"):
+        if stale != directory:
+            shutil.rmtree(stale, ignore_errors=True)
+    try:
+        write_snapshot(df, directory)
+    except OSError:
+        # Read-only or full data directory: serve the frame without a snapshot
+        pass
+    return df
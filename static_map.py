@@ -0,0 +1,313 @@
+"""
+Browser-free static choropleth maps.
+
+`px.choropleth` plus kaleido needs a headless Chrome for every export. This
+renderer instead draws the bundled Natural Earth boundaries itself:
+
+* Geometries are projected once (Natural Earth projection, as in the plotly
+  map), simplified at several tolerances and cached as flat coordinate arrays
+  in `.geometry_cache/`, keyed by the boundary file's hash. Each export picks
+  the coarsest level whose tolerance stays below a pixel.
+* PNGs are rasterized with a vectorized even-odd scanline fill on a
+  supersampled grid (for anti-aliasing), outlined by stroking every ring
+  edge on the same grid, and encoded with zlib; the title and legend use a
+  built-in 5x7 bitmap font (printable ASCII). SVGs are written as one path
+  per country.
+
+Both outputs depend only on the inputs, so repeated exports are byte-identical.
+"""
+import struct
+import zlib
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+
+import numpy as np
+
+from countries import BOUNDARY_FILE, BOUNDARY_NAME_FIXES, COUNTRY_TABLE
+from snapshot import file_digest
+
+CACHE_DIR = Path(".geometry_cache")
+GEOMETRY_VERSION = 1
+PROJECTION = "+proj=natearth +datum=WGS84"
+# Simplification tolerance (projected metres) per level, coarsest first
+LEVELS = {"low": 50_000, "medium": 15_000, "high": 5_000, "full": 0}
+# Half-width and half-height of the projected world (lon ±180, lat ±90)
+EXTENT = (17_446_658.5, 9_072_201.5)
+
+LAND_COLOR = "#d3d3d3"
+OCEAN_COLOR = "#add8e6"
+BORDER_COLOR = "#ffffff"
+TEXT_COLOR = "#000000"
+SUPERSAMPLE = 4
+TEXT_SCALE = 2
+
+# 5x7 glyphs of printable ASCII (space to "~"): five column bytes each, bit 0 at the top
+_FONT = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12" "2313086462" "3649552250" "0005030000"
+    "001c224100" "0041221c00" "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000" "2010080402"
+    "3e5149453e" "00427f4000" "4261514946" "2141454b31" "1814127f10" "2745454539" "3c4a494930" "0171090503"
+    "3649494936" "064949291e" "0036360000" "0056360000" "0814224100" "1414141414" "0041221408" "0201510906"
+    "324979413e" "7e1111117e" "7f49494936" "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040" "7f0204027f" "7f0408107f" "3e4141413e"
+    "7f09090906" "3e4151215e" "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f" "7f2018207f"
+    "6314081463" "0304780403" "6151494543" "00007f4141" "0204081020" "41417f0000" "0402010204" "4040404040"
+    "0001020400" "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418" "087e090102" "081454543c"
+    "7f08040478" "00447d4000" "2040443d00" "007f102844" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020" "3c4040207c" "1c2040201c" "3c4030403c"
+    "4428102844" "0c5050503c" "4464544c44" "0008364100" "00007f0000" "0041360800" "1008081008"
+)
+
+
+def _hex_rgb(color: str) -> np.ndarray:
+    color = color.lstrip("#")
+    return np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)], dtype=float)
+
+
+class BoundaryGeometry:
+    """Projected country rings at one simplification level, as flat arrays"""
+    def __init__(self, coords: np.ndarray, ring_offsets: np.ndarray, ring_country: np.ndarray,
+                 country_iso: np.ndarray, country_names: np.ndarray):
+        self.coords = coords                    # (points, 2) float64, projected metres
+        self.ring_offsets = ring_offsets        # ring i is coords[ring_offsets[i]:ring_offsets[i + 1]]
+        self.ring_country = ring_country        # country position of each ring
+        self.country_iso = country_iso          # numeric ISO code of each country (0 if unknown)
+        self.country_names = country_names
+
+    def rings(self, countries=None):
+        """Coordinate arrays of the rings of the given country positions (all by default)"""
+        selected = np.arange(len(self.ring_country)) if countries is None else \
+            np.flatnonzero(np.isin(self.ring_country, countries))
+        return [self.coords[self.ring_offsets[i]:self.ring_offsets[i + 1]] for i in selected]
+
+
+def _build_levels(boundary_file):
+    """Project and simplify the boundary file at every level"""
+    import geopandas as gpd
+    import pandas as pd
+    import shapely
+
+    world = gpd.read_file(boundary_file).to_crs(PROJECTION)
+    alpha3 = world["name"].map(BOUNDARY_NAME_FIXES).fillna(world["iso_a3"])
+    countries = pd.read_csv(COUNTRY_TABLE)
+    numeric = alpha3.map(dict(zip(countries["iso_alpha3"], countries["iso_numeric"]))).fillna(0)
+
+    levels = {}
+    for level, tolerance in LEVELS.items():
+        geometry = world.geometry.simplify(tolerance) if tolerance else world.geometry
+        rings, ring_country = [], []
+        for position, shape in enumerate(geometry.values):
+            for polygon in getattr(shape, "geoms", [shape]):
+                for ring in [polygon.exterior, *polygon.interiors]:
+                    rings.append(shapely.get_coordinates(ring))
+                    ring_country.append(position)
+        levels[level] = {
+            "coords": np.concatenate(rings),
+            "ring_offsets": np.concatenate(([0], np.cumsum([len(ring) for ring in rings]))),
+            "ring_country": np.array(ring_country, dtype=np.int32),
+            "country_iso": numeric.to_numpy(dtype=np.int32),
+            "country_names": world["name"].to_numpy(dtype=str),
+        }
+    return levels
+
+
+@lru_cache(maxsize=None)
+def load_geometry(level: str = "medium", boundary_file=BOUNDARY_FILE, cache_dir=CACHE_DIR) -> BoundaryGeometry:
+    """Boundary geometry at a simplification level, from the cache (built on first use)"""
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {list(LEVELS)}, got {level!r}")
+    cache_dir = Path(cache_dir)
+    key = f"{file_digest(boundary_file)[:16]}-v{GEOMETRY_VERSION}"
+    path = cache_dir / f"{key}.{level}.npz"
+    if not path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for name, arrays in _build_levels(boundary_file).items():
+            partial = cache_dir / f"{key}.{name}.tmp.npz"
+            np.savez(partial, **arrays)
+            partial.replace(cache_dir / f"{key}.{name}.npz")
+    with np.load(path) as arrays:
+        return BoundaryGeometry(**{name: arrays[name] for name in arrays.files})
+
+
+def level_for_width(width: int) -> str:
+    """Coarsest level whose tolerance is below one pixel at `width`"""
+    pixel = 2 * EXTENT[0] / width
+    for level, tolerance in LEVELS.items():
+        if tolerance <= pixel:
+            return level
+    return "full"
+
+
+def _to_pixels(coords: np.ndarray, width: int, height: int) -> np.ndarray:
+    x = (coords[:, 0] + EXTENT[0]) / (2 * EXTENT[0]) * width
+    y = (EXTENT[1] - coords[:, 1]) / (2 * EXTENT[1]) * height
+    return np.column_stack([x, y])
+
+
+def rasterize(rings, width: int, height: int, supersample: int = SUPERSAMPLE) -> np.ndarray:
+    """
+    Coverage (0-1) of each pixel by the union of `rings` (pixel coordinates),
+    filled with the even-odd rule. Scanlines run through the centres of the
+    supersampled rows; all ring edges are intersected with all scanlines at once.
+    """
+    rows, columns = height * supersample, width * supersample
+    if not rings:
+        return np.zeros((height, width))
+    starts = np.concatenate([ring[:-1] for ring in rings]) * supersample
+    ends = np.concatenate([ring[1:] for ring in rings]) * supersample
+    y0, y1 = starts[:, 1], ends[:, 1]
+    # Scanline r (centre r + 0.5) crosses an edge if it lies in [min(y), max(y))
+    first = np.ceil(np.minimum(y0, y1) - 0.5).astype(np.int64).clip(0, rows)
+    last = np.ceil(np.maximum(y0, y1) - 0.5).astype(np.int64).clip(0, rows)
+    crossings = last - first
+    edge = np.repeat(np.arange(len(starts)), crossings)
+    row = np.repeat(first - np.cumsum(crossings) + crossings, crossings) + np.arange(crossings.sum())
+    t = (row + 0.5 - y0[edge]) / (y1[edge] - y0[edge])
+    x = starts[edge, 0] + t * (ends[edge, 0] - starts[edge, 0])
+
+    # Pair up crossings left to right within each scanline: inside between 1st and 2nd, 3rd and 4th, ...
+    order = np.lexsort((x, row))
+    row, x = row[order], x[order]
+    column = np.ceil(x - 0.5).astype(np.int64).clip(0, columns)
+    sign = np.where(np.arange(len(row)) % 2 == 0, 1, -1).astype(np.int8)
+    changes = np.zeros(rows * (columns + 1), dtype=np.int8)
+    np.add.at(changes, row * (columns + 1) + column, sign)
+    inside = np.cumsum(changes.reshape(rows, columns + 1)[:, :columns], axis=1, dtype=np.int8) > 0
+    covered = inside.reshape(height, supersample, width, supersample).sum(axis=(1, 3), dtype=np.uint16)
+    return covered / supersample ** 2
+
+
+def stroke(rings, width: int, height: int, supersample: int = SUPERSAMPLE) -> np.ndarray:
+    """
+    Coverage (0-1) of each pixel by the edges of `rings` (pixel coordinates),
+    about half a pixel wide: every edge is sampled once per supersampled pixel
+    and each sample marks a 2x2 block of the supersampled grid.
+    """
+    rows, columns = height * supersample, width * supersample
+    if not rings:
+        return np.zeros((height, width))
+    starts = np.concatenate([ring[:-1] for ring in rings]) * supersample
+    ends = np.concatenate([ring[1:] for ring in rings]) * supersample
+    samples = np.ceil(np.hypot(*(ends - starts).T)).astype(np.int64) + 1
+    edge = np.repeat(np.arange(len(starts)), samples)
+    t = (np.arange(samples.sum()) - np.repeat(np.cumsum(samples) - samples, samples)) / np.repeat(samples - 1, samples)
+    points = starts[edge] + t[:, None] * (ends[edge] - starts[edge])
+    marked = np.zeros((rows + 1, columns + 1), dtype=bool)
+    x = np.floor(points[:, 0] - 0.5).astype(np.int64).clip(0, columns - 1)
+    y = np.floor(points[:, 1] - 0.5).astype(np.int64).clip(0, rows - 1)
+    for dy in (0, 1):
+        for dx in (0, 1):
+            marked[y + dy, x + dx] = True
+    covered = marked[:rows, :columns].reshape(height, supersample, width, supersample).sum(axis=(1, 3),
+                                                                                         dtype=np.uint16)
+    return covered / supersample ** 2
+
+
+def text_mask(text: str, scale: int = TEXT_SCALE) -> np.ndarray:
+    """Boolean (7 * scale, 6 * len(text) * scale) bitmap of a line of text; non-ASCII characters show as ?"""
+    columns = []
+    for character in text:
+        code = ord(character) - 0x20 if " " <= character <= "~" else ord("?") - 0x20
+        columns.extend(_FONT[5 * code:5 * code + 5])
+        columns.append(0)
+    bits = (np.array(columns, dtype=np.uint8)[None, :] >> np.arange(7, dtype=np.uint8)[:, None]) & 1
+    return np.kron(bits, np.ones((scale, scale), dtype=np.uint8)).astype(bool)
+
+
+def _paint(image: np.ndarray, mask: np.ndarray, x: int, y: int, color: str):
+    """Paint `mask` onto `image` with its top-left corner at (x, y), clipped to the image"""
+    height, width = mask.shape
+    top, left = max(y, 0), max(x, 0)
+    bottom, right = min(y + height, image.shape[0]), min(x + width, image.shape[1])
+    if bottom <= top or right <= left:
+        return
+    region = mask[top - y:bottom - y, left - x:right - x]
+    image[top:bottom, left:right][region] = _hex_rgb(color)
+
+
+def _png_bytes(image: np.ndarray) -> bytes:
+    """Encode an (height, width, 3) uint8 image as PNG"""
+    height, width, _ = image.shape
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+class StaticMap:
+    """Choropleth maps of countries, colored by numeric ISO code, without a browser"""
+    def __init__(self, land_color: str = LAND_COLOR, ocean_color: str = OCEAN_COLOR,
+                 boundary_file=BOUNDARY_FILE, cache_dir=CACHE_DIR):
+        self.land_color = land_color
+        self.ocean_color = ocean_color
+        self.boundary_file = boundary_file
+        self.cache_dir = cache_dir
+
+    def _geometry(self, width: int, level: str = None) -> BoundaryGeometry:
+        return load_geometry(level or level_for_width(width), self.boundary_file, self.cache_dir)
+
+    def _groups(self, geometry: BoundaryGeometry, colors: dict) -> dict:
+        """Color ➜ country positions, with uncolored countries in the land color"""
+        groups = {}
+        for position, iso in enumerate(geometry.country_iso):
+            groups.setdefault(colors.get(int(iso), self.land_color), []).append(position)
+        return groups
+
+    def to_png(self, colors: dict, width: int = 1600, level: str = None, title: str = None,
+               legend: dict = None) -> bytes:
+        """PNG bytes of the map; `colors` maps numeric ISO codes to "#rrggbb" colors, `legend` labels to colors"""
+        geometry = self._geometry(width, level)
+        height = round(width * EXTENT[1] / EXTENT[0])
+        image = np.broadcast_to(_hex_rgb(self.ocean_color), (height, width, 3)).copy()
+        for color, countries in sorted(self._groups(geometry, colors).items()):
+            rings = [_to_pixels(ring, width, height) for ring in geometry.rings(countries)]
+            coverage = rasterize(rings, width, height)[..., None]
+            image = image * (1 - coverage) + _hex_rgb(color) * coverage
+        borders = stroke([_to_pixels(ring, width, height) for ring in geometry.rings()], width, height)[..., None]
+        image = np.round(image * (1 - borders) + _hex_rgb(BORDER_COLOR) * borders).astype(np.uint8)
+        # Same layout as the SVG title and legend
+        if title:
+            mask = text_mask(title)
+            _paint(image, mask, round(width / 2 - mask.shape[1] / 2), 28 - mask.shape[0], TEXT_COLOR)
+        for i, (label, color) in enumerate((legend or {}).items()):
+            y = 50 + 22 * i
+            _paint(image, np.ones((14, 14), dtype=bool), 12, y, color)
+            _paint(image, text_mask(str(label)), 32, y, TEXT_COLOR)
+        return _png_bytes(image)
+
+    def to_svg(self, colors: dict, width: int = 1600, level: str = None, title: str = None,
+               legend: dict = None) -> str:
+        """SVG document of the map; `legend` maps labels to colors"""
+        geometry = self._geometry(width, level)
+        height = round(width * EXTENT[1] / EXTENT[0])
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                 f'viewBox="0 0 {width} {height}">',
+                 f'<rect width="{width}" height="{height}" fill="{self.ocean_color}"/>']
+        for position, name in enumerate(geometry.country_names):
+            color = colors.get(int(geometry.country_iso[position]), self.land_color)
+            path = " ".join("M" + " L".join(f"{x:.1f} {y:.1f}" for x, y in _to_pixels(ring, width, height)) + " Z"
+                            for ring in geometry.rings([position]))
+            parts.append(f'<path d="{path}" fill="{color}" fill-rule="evenodd" stroke="{BORDER_COLOR}" '
+                         f'stroke-width="0.4"><title>{escape(str(name))}</title></path>')
+        if title:
+            parts.append(f'<text x="{width / 2:.0f}" y="28" text-anchor="middle" font-family="sans-serif" '
+                         f'font-size="20">{escape(title)}</text>')
+        for i, (label, color) in enumerate((legend or {}).items()):
+            y = 50 + 22 * i
+            parts.append(f'<rect x="12" y="{y}" width="14" height="14" fill="{color}"/>'
+                         f'<text x="32" y="{y + 12}" font-family="sans-serif" font-size="13">{escape(label)}</text>')
+        parts.append("</svg>")
+        return "\n".join(parts) + "\n"
+
+    def write(self, colors: dict, path, width: int = 1600, **kwargs):
+        """Write a .png or .svg, by extension"""
+        path = Path(path)
+        if path.suffix.lower() == ".svg":
+            path.write_text(self.to_svg(colors, width, **kwargs), encoding="utf-8")
+        else:
+            path.write_bytes(self.to_png(colors, width, **kwargs))
+        return path
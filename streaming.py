@@ -0,0 +1,104 @@
+"""
+Constant-memory statistics over holiday tables of any size.
+
+The overlap and season statistics only depend on how many rows fall on each
+day of the year in each hemisphere. `HolidayCounts` keeps exactly that, a
+fixed hemisphere x day-of-year table of counts, and `count_csv` fills it by
+reading the CSV in chunks: each chunk's dates and ISO codes are parsed with
+the same vectorized parsers as the in-memory path, folded into the table with
+one `bincount`, and discarded. Memory use depends on the chunk size, not on
+the size of the file.
+"""
+import numpy as np
+import pandas as pd
+
+from countries import iso_hemisphere_codes
+from dates import DAYS_IN_YEAR, HEMISPHERES, SEASON_BY_DAY, SEASONS, UNKNOWN_DAY, parse_display_dates
+
+DEFAULT_CHUNKSIZE = 1_000_000
+SLOTS = DAYS_IN_YEAR + 1
+
+
+class HolidayCounts:
+    """Number of rows on each day of the year (0 = unknown), per hemisphere code"""
+    def __init__(self):
+        self.counts = np.zeros((len(HEMISPHERES), SLOTS), dtype=np.int64)
+
+    def add(self, day_of_year, hemisphere_code):
+        """Fold rows, given as day-of-year and hemisphere code arrays, into the counts"""
+        flat = np.asarray(hemisphere_code, dtype=np.intp) * SLOTS + np.asarray(day_of_year, dtype=np.intp)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def add_frame(self, frame: pd.DataFrame):
+        """Fold rows of a frame with the CSV's "ISO Code" and "Display Date" columns"""
+        iso_numeric = pd.to_numeric(frame['ISO Code'], errors='coerce')
+        return self.add(parse_display_dates(frame['Display Date']), iso_hemisphere_codes(iso_numeric))
+
+    def merge(self, other: "HolidayCounts"):
+        self.counts += other.counts
+        return self
+
+    @classmethod
+    def from_dataset(cls, dataset):
+        """Counts of an in-memory `HolidayDataset`"""
+        return cls().add(dataset.day_of_year.to_numpy(), dataset.hemisphere_code)
+
+    def codes(self):
+        """(hemisphere code, day-of-year) of every counted row, grouped by code, for row-level tests"""
+        flat = np.repeat(np.arange(self.counts.size), self.counts.ravel())
+        return flat // SLOTS, flat % SLOTS
+
+    @property
+    def rows(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def by_day(self) -> np.ndarray:
+        """Rows on each known day of the year (index 0 = 1 January)"""
+        return self.counts[:, UNKNOWN_DAY + 1:].sum(axis=0)
+
+    def overlap_counts(self, sizes=None) -> dict:
+        """Number of days with exactly k rows, for each k in `sizes` (default: 1 up to the busiest day)"""
+        days_with = np.bincount(self.by_day)
+        if sizes is None:
+            sizes = range(1, len(days_with))
+        return {k: int(days_with[k]) if k < len(days_with) else 0 for k in sizes}
+
+    def by_hemisphere_and_season(self) -> np.ndarray:
+        """Rows per hemisphere code and (Northern calendar) season code"""
+        season_indicator = np.eye(len(SEASONS), dtype=np.int64)[SEASON_BY_DAY]
+        return self.counts @ season_indicator
+
+    def season_counts(self) -> pd.Series:
+        """Rows per (Northern calendar) season, like `Choropleth.get_season_stats`"""
+        totals = pd.Series(self.by_hemisphere_and_season().sum(axis=0), index=pd.Index(SEASONS, name='season'),
+                           name='count')
+        return totals[totals > 0].sort_values(ascending=False, kind='stable')
+
+    def hemisphere_counts(self) -> pd.Series:
+        """Rows per known hemisphere"""
+        totals = pd.Series(self.counts.sum(axis=1), index=pd.Index(HEMISPHERES, name='hemisphere'), name='count')
+        totals = totals.iloc[1:]
+        return totals[totals > 0].sort_values(ascending=False, kind='stable')
+
+    def hemisphere_season(self) -> pd.DataFrame:
+        """Hemisphere by season cross-tabulation, like `Choropleth.get_hemisphere_stats`"""
+        table = pd.DataFrame(self.by_hemisphere_and_season(), index=pd.Index(HEMISPHERES, name='hemisphere'),
+                             columns=pd.Index(SEASONS, name='season')).iloc[1:]
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        return table.sort_index(axis=0).sort_index(axis=1)
+
+
+def iter_chunks(path_to_data, chunksize: int = DEFAULT_CHUNKSIZE):
+    """The CSV's "ISO Code" and "Display Date" columns, `chunksize` rows at a time"""
+    return pd.read_csv(path_to_data, usecols=['ISO Code', 'Display Date'],
+                       dtype={'ISO Code': str, 'Display Date': str}, chunksize=chunksize)
+
+
+def count_csv(path_to_data, chunksize: int = DEFAULT_CHUNKSIZE) -> HolidayCounts:
+    """Stream a CSV into `HolidayCounts` without holding more than one chunk in memory"""
+    counts = HolidayCounts()
+    for chunk in iter_chunks(path_to_data, chunksize):
+        counts.add_frame(chunk)
+    return counts
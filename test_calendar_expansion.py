@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for expanding year-less holidays onto concrete calendars
+
+Checks every day of the leap-year calendar against `datetime` for each
+29 February policy, over years on both sides of the century and 400-year
+leap rules. Runs as a script or under pytest.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from calendar_expansion import LEAP_DAY, LEAP_DAY_POLICIES, CalendarExpansion, is_leap
+from dates import DAYS_IN_YEAR, UNKNOWN_DAY
+
+# 1900 and 2100 are common, 2000 is leap; 1899..1905 and 2096..2104 cross the century edges
+YEARS = [1600, 1700, 1899, 1900, 1901, 1904, 1970, 1999, 2000, 2001, 2023, 2024, 2025, 2096, 2100, 2104]
+
+
+def _expected(day: int, year: int, leap_day: str):
+    """The date a leap-calendar day-of-year falls on in `year`, per `datetime`"""
+    if day == UNKNOWN_DAY:
+        return None
+    leap_date = date(2000, 1, 1) + timedelta(days=day - 1)
+    try:
+        return leap_date.replace(year=year)
+    except ValueError:
+        # 29 February in a common year
+        return {"feb28": date(year, 2, 28), "mar1": date(year, 3, 1), "skip": None}[leap_day]
+
+
+def test_is_leap():
+    assert is_leap(YEARS).tolist() == [date(year, 3, 1).toordinal() - date(year, 2, 28).toordinal() == 2
+                                       for year in YEARS]
+
+
+def test_every_day_matches_datetime():
+    days = np.arange(UNKNOWN_DAY, DAYS_IN_YEAR + 1)
+    for leap_day in LEAP_DAY_POLICIES:
+        expansion = CalendarExpansion(days, YEARS, leap_day)
+        dates, weekdays = expansion.dates, expansion.weekdays
+        for i, day in enumerate(days):
+            for j, year in enumerate(YEARS):
+                expected = _expected(int(day), year, leap_day)
+                if expected is None:
+                    assert np.isnat(dates[i, j]) and weekdays[i, j] == -1, (day, year, leap_day)
+                else:
+                    assert pd.Timestamp(dates[i, j]).date() == expected, (day, year, leap_day)
+                    assert weekdays[i, j] == expected.weekday(), (day, year, leap_day)
+
+
+def test_leap_day_policies():
+    common, leap = 2100, 2000
+    for leap_day, observed in [("feb28", date(common, 2, 28)), ("mar1", date(common, 3, 1)), ("skip", None)]:
+        expansion = CalendarExpansion([LEAP_DAY, LEAP_DAY + 1], [common, leap], leap_day)
+        assert pd.Timestamp(expansion.dates[0, 1]).date() == date(leap, 2, 29)
+        assert pd.Timestamp(expansion.dates[1, 0]).date() == date(common, 3, 1)
+        if observed is None:
+            assert np.isnat(expansion.dates[0, 0])
+            assert expansion.weekday_counts().iloc[0].sum() == 1
+        else:
+            assert pd.Timestamp(expansion.dates[0, 0]).date() == observed
+
+
+def test_counts_over_default_span():
+    expansion = CalendarExpansion(np.arange(1, DAYS_IN_YEAR + 1))
+    years = len(expansion.years)
+    leap_years = int(is_leap(expansion.years).sum())
+    assert (expansion.weekday_counts().sum(axis=1) == years).all()
+    assert (expansion.weekday_by_year().sum(axis=1).to_numpy() == DAYS_IN_YEAR).all()
+    assert CalendarExpansion([LEAP_DAY], leap_day="skip").weekday_counts().to_numpy().sum() == leap_years
+    try:
+        CalendarExpansion([1], leap_day="feb29")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("an unknown leap_day policy was accepted")
+
+
+def main():
+    for test in (test_is_leap, test_every_day_matches_datetime, test_leap_day_policies,
+                 test_counts_over_default_span):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
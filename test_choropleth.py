@@ -1,23 +1,10 @@
 #!/usr/bin/env python3
 """
-Test script for the Choropleth visualization
+Test script for the Choropleth visualization: season statistics and the map
 """
+import sys
 
-from visualization import Choropleth
-
-def main():
-    # Create the choropleth visualization
-    choropleth = Choropleth()
-    
-    # Display season statistics
-    print("=== Independence and National Days by Season ===")
-    choropleth.get_season_stats()
-    
-    # Create and display the map
-    print("\nGenerating choropleth map...")
-    fig = choropleth.plot()
-    
-    print("Choropleth map has been generated and displayed!")
+from cli import main
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main(["stats"]) or main(["figure", "choropleth_map", *sys.argv[1:]]))
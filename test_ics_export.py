@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the iCalendar export
+
+Checks that every content line is folded to at most 75 octets without
+splitting a UTF-8 character, that UIDs are stable from one export to the
+next, and that events are labelled by the source of the display date
+(Hungary's is its National Day). Runs as a script or under pytest.
+"""
+import io
+import re
+from datetime import datetime, timezone
+
+from dataset import HolidayDataset
+from ics_export import _fold, feed_frame, iter_ics, write_ics
+
+YEARS = range(2024, 2027)
+STAMP = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _feed(countries=None, name=None, stamp=STAMP) -> bytes:
+    sink = io.BytesIO()
+    write_ics(iter_ics(feed_frame(HolidayDataset.load()), YEARS, countries, name=name, stamp=stamp), sink)
+    return sink.getvalue()
+
+
+def _unfold(feed: bytes) -> list:
+    return feed.decode("utf-8").replace("\r\n ", "").split("\r\n")
+
+
+def test_lines_fold_at_75_octets():
+    name = "Fête nationale — " * 12 + "ünnepe"
+    feed = _feed(name=name)
+    physical = feed.split(b"\r\n")
+    assert physical[-1] == b""
+    assert all(len(line) <= 75 for line in physical)
+    # Every physical line decodes on its own, so no multi-byte character was split
+    for line in physical:
+        line.decode("utf-8")
+    assert f"X-WR-CALNAME:{name}" in _unfold(feed)
+
+    for line in ["A" * 75, "B" * 76, "é" * 100, "SUMMARY:" + "€" * 40]:
+        folded = _fold(line)
+        assert all(len(part.encode("utf-8")) <= 75 for part in folded.split("\r\n"))
+        assert folded.replace("\r\n ", "") == line + "\r\n"
+
+
+def test_uids_are_stable_across_exports():
+    first, second = _feed(), _feed()
+    assert first == second
+    later = _feed(stamp=datetime(2030, 6, 1, tzinfo=timezone.utc))
+    uids = [line for line in _unfold(first) if line.startswith("UID:")]
+    assert uids == [line for line in _unfold(later) if line.startswith("UID:")]
+    assert len(uids) == len(set(uids))
+    assert all(re.fullmatch(r"UID:[a-z0-9-]+-\d{3}-\d{4}@independence-national-days", uid) for uid in uids)
+
+
+def test_hungary_is_labelled_national_day():
+    lines = _unfold(_feed(["Hungary"]))
+    summaries = [line for line in lines if line.startswith("SUMMARY:")]
+    assert summaries == ["SUMMARY:Hungary National Day"] * len(YEARS)
+    assert "CATEGORIES:National Day" in lines
+    # Israel's display date is its Independence Day
+    assert "SUMMARY:Israel Independence Day" in _unfold(_feed(["Israel"]))
+
+
+def main():
+    for test in (test_lines_fold_at_75_octets, test_uids_are_stable_across_exports,
+                 test_hungary_is_labelled_national_day):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
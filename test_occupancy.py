@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the binomial and exact occupancy distributions
+
+Checks the log-space binomial pmf against scipy, the occupancy solver against
+brute-force enumeration on a small calendar, and against the Monte Carlo
+simulator for the real number of holidays. Runs as a script or under pytest.
+"""
+import itertools
+
+import numpy as np
+
+from analysis import BinomialDistribution, OccupancyDistribution
+from simulation import MonteCarloOverlaps
+
+
+def test_binomial_matches_scipy():
+    from scipy.stats import binom
+
+    for n, p in [(201, 1 / 365), (10_000, 1 / 365), (10**6, 1 / 366)]:
+        k = np.arange(0, 40)
+        expected = binom.pmf(k, n, p)
+        assert np.allclose(BinomialDistribution(n, p).pmf(k), expected, rtol=1e-9, atol=1e-300), (n, p)
+    # Outside the support the pmf is zero rather than NaN
+    assert BinomialDistribution(10, 0.5).pmf([-1, 11]).tolist() == [0.0, 0.0]
+
+
+def test_occupancy_matches_enumeration():
+    n, days = 6, 4
+    counts = {}
+    for assignment in itertools.product(range(days), repeat=n):
+        per_day = np.bincount(assignment, minlength=days)
+        for k in range(n + 1):
+            j = int((per_day == k).sum())
+            counts[k, j] = counts.get((k, j), 0) + 1
+    total = days ** n
+    occupancy = OccupancyDistribution(n, days)
+    for k in range(1, n + 1):
+        exact = np.array([counts.get((k, j), 0) / total for j in range(days + 1)])
+        assert np.allclose(occupancy.distribution(k), exact, atol=1e-9), k
+
+
+def test_occupancy_agrees_with_monte_carlo():
+    n, trials = 201, 200_000
+    occupancy = OccupancyDistribution(n)
+    simulation = MonteCarloOverlaps(n, trials=trials, max_k=8, seed=0, workers=1)
+    for k in range(1, 5):
+        exact = occupancy.distribution(k)
+        simulated = simulation.distribution(k).to_numpy()
+        # Total variation distance within Monte Carlo noise
+        assert 0.5 * np.abs(exact - simulated).sum() < 0.01, k
+        assert abs(simulation.mean(k) - occupancy.mean(k)) < 0.05 * max(occupancy.mean(k), 1), k
+    assert (occupancy.percentiles([1, 2]) - simulation.percentiles([1, 2])).abs().to_numpy().max() <= 1
+
+
+def main():
+    for test in (test_binomial_matches_scipy, test_occupancy_matches_enumeration,
+                 test_occupancy_agrees_with_monte_carlo):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
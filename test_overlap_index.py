@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental overlap index
+
+Checks `OverlapIndex` built from the real data against
+`EmpiricalOverlaps.count_overlaps`, and a long run of random add, remove
+and re-date edits against a full recount after every edit. Runs as a script
+or under pytest.
+"""
+import random
+from collections import Counter
+
+import numpy as np
+
+from analysis import EmpiricalOverlaps
+from dataset import HolidayDataset
+from dates import DAYS_IN_YEAR, UNKNOWN_DAY
+from overlap_index import OverlapIndex
+
+
+def _recount(days: dict) -> tuple:
+    """Per-day counts and days-with-exactly-k histogram of key ➜ day, from scratch"""
+    per_day = Counter(day for day in days.values() if day != UNKNOWN_DAY)
+    histogram = Counter(per_day.values())
+    return per_day, {k: histogram.get(k, 0) for k in range(1, max(histogram, default=0) + 1)}
+
+
+def _check(index: OverlapIndex, days: dict):
+    per_day, histogram = _recount(days)
+    assert len(index) == len(days)
+    assert index.overlap_counts() == histogram, (index.overlap_counts(), histogram)
+    assert index.max_overlap == max(histogram, default=0)
+    assert index.occupancy.tolist() == [per_day.get(day, 0) for day in range(1, DAYS_IN_YEAR + 1)]
+    assert index.count(UNKNOWN_DAY) == sum(day == UNKNOWN_DAY for day in days.values())
+    assert len(index.dates_with(0)) == DAYS_IN_YEAR - len(per_day)
+
+
+def test_matches_count_overlaps():
+    dataset = HolidayDataset.load()
+    index = OverlapIndex.from_dataset(dataset)
+    assert index.overlap_counts() == EmpiricalOverlaps(dataset=dataset).count_overlaps()
+    assert np.array_equal(index.occupancy,
+                          np.bincount(dataset.day_of_year.to_numpy().astype(np.int64),
+                                      minlength=DAYS_IN_YEAR + 1)[1:])
+    _check(index, dict(zip(dataset.table.index, dataset.day_of_year.to_numpy().astype(int).tolist())))
+
+
+def test_random_edits_match_recount(edits: int = 20_000, seed: int = 0):
+    rng = random.Random(seed)
+    index, days = OverlapIndex(), {}
+    # A narrow range of days keeps overlaps (and deep buckets) common
+    pick_day = lambda: rng.choice([UNKNOWN_DAY, *range(1, 40), DAYS_IN_YEAR])
+    next_key = 0
+    for _ in range(edits):
+        action = rng.random()
+        if not days or action < 0.4:
+            day = pick_day()
+            index.add(f"country {next_key}", day, key=next_key)
+            days[next_key] = day
+            next_key += 1
+        elif action < 0.7:
+            key = rng.choice(list(days))
+            index.remove(key)
+            del days[key]
+        else:
+            key, day = rng.choice(list(days)), pick_day()
+            index.redate(key, day)
+            days[key] = day
+        _check(index, days)
+    for key, day in days.items():
+        assert index.date_of(key) == day
+
+
+def main():
+    for test in (test_matches_count_overlaps, test_random_edits_match_recount):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
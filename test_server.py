@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP service
+
+Drives `handle_connection` through a loopback server on an ephemeral port
+with raw HTTP/1.1 requests: a matching `If-None-Match` gets an empty 304, a
+malformed Content-Length gets a 400 and closes the connection, and calendar
+feeds arrive chunked and complete. Runs as a script or under pytest.
+"""
+import asyncio
+from functools import lru_cache
+
+from dataset import HolidayDataset
+from server import HolidayService, handle_connection
+
+
+@lru_cache(maxsize=None)
+def _service() -> HolidayService:
+    return HolidayService(HolidayDataset.load(), workers=2)
+
+
+async def _read_response(reader):
+    """(status, headers, body) of one response, decoding a chunked body"""
+    status_line, *header_lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = {}
+    for line in filter(None, header_lines):
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            chunks.append(chunk[:-2])
+        body = b"".join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(status_line.split(" ")[1]), headers, body
+
+
+def _exchange(*requests):
+    """Send `requests` on one connection and read one response per request"""
+    async def run():
+        service = _service()
+        server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            responses = []
+            for request in requests:
+                writer.write(request)
+                await writer.drain()
+                responses.append(await _read_response(reader))
+            closed = await reader.read() == b""
+            writer.close()
+            return responses, closed
+    return asyncio.run(run())
+
+
+def test_matching_etag_gets_304():
+    [(status, headers, body)], _ = _exchange(b"GET /stats/seasons HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert status == 200 and body
+    etag = headers["etag"]
+    responses, _ = _exchange(
+        f"GET /stats/seasons HTTP/1.1\r\nIf-None-Match: {etag}\r\n\r\n".encode(),
+        b'GET /stats/seasons HTTP/1.1\r\nIf-None-Match: "stale"\r\nConnection: close\r\n\r\n',
+    )
+    (status, headers, body), (stale_status, _, stale_body) = responses
+    assert (status, headers["content-length"], headers["etag"], body) == (304, "0", etag, b"")
+    assert stale_status == 200 and stale_body
+
+
+def test_malformed_content_length_gets_400():
+    for length in (b"abc", b"-1", b"\xc2\xb2"):
+        responses, closed = _exchange(b"GET /health HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+        [(status, headers, body)] = responses
+        assert status == 400 and b"Content-Length" in body, length
+        assert headers["connection"] == "close" and closed, length
+
+
+def test_calendar_feed_is_chunked():
+    responses, closed = _exchange(b"GET /calendars/Hungary.ics HTTP/1.1\r\n\r\n",
+                                  b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+    (status, headers, body), (health_status, _, _) = responses
+    assert status == 200 and headers["transfer-encoding"] == "chunked"
+    assert "content-length" not in headers
+    assert body.startswith(b"BEGIN:VCALENDAR\r\n") and body.endswith(b"END:VCALENDAR\r\n")
+    assert body.count(b"SUMMARY:Hungary National Day") == 201
+    # The connection stays usable after the terminating chunk
+    assert health_status == 200 and closed
+
+
+def main():
+    for test in (test_matching_etag_gets_304, test_malformed_content_length_gets_400,
+                 test_calendar_feed_is_chunked):
+        test()
+        print(f"✓ {test.__name__}")
+    _service().close()
+
+
+if __name__ == "__main__":
+    main()
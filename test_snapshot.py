@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar snapshots
+
+Checks that editing the CSV serves the new data and removes the stale
+snapshot, that bumping `SNAPSHOT_VERSION` forces a rebuild, and that a
+round-trip keeps nullable, boolean and categorical columns intact. Runs as a
+script or under pytest.
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import snapshot
+from dataset import DEFAULT_PATH, HolidayDataset
+
+
+def _copy_csv(directory) -> Path:
+    path = Path(directory) / "holidays.csv"
+    shutil.copyfile(DEFAULT_PATH, path)
+    return path
+
+
+def _snapshot_dirs(path):
+    return sorted((path.parent / snapshot.SNAPSHOT_DIR_NAME).glob(f"{path.stem}.dataset.*"))
+
+
+def test_edited_csv_replaces_stale_snapshot():
+    with tempfile.TemporaryDirectory() as directory:
+        path = _copy_csv(directory)
+        before = HolidayDataset.from_csv(path)
+        [stale] = _snapshot_dirs(path)
+        assert HolidayDataset.from_csv(path).version == before.version
+
+        # Drop the last country from the file
+        lines = path.read_text().splitlines(keepends=True)
+        path.write_text("".join(lines[:-1]))
+        after = HolidayDataset.from_csv(path)
+        assert after.version != before.version
+        assert len(after) == len(before) - 1
+        pd.testing.assert_frame_equal(after.df, HolidayDataset.from_csv(path, use_snapshot=False).df)
+        [current] = _snapshot_dirs(path)
+        assert current != stale and not stale.exists()
+
+
+def test_version_bump_forces_rebuild():
+    with tempfile.TemporaryDirectory() as directory:
+        path = _copy_csv(directory)
+        calls = []
+
+        def build(p):
+            calls.append(p)
+            return pd.DataFrame({"value": np.arange(3)})
+
+        snapshot.load_cached(path, "probe", build)
+        snapshot.load_cached(path, "probe", build)
+        assert len(calls) == 1
+        version = snapshot.SNAPSHOT_VERSION
+        snapshot.SNAPSHOT_VERSION = version + 1
+        try:
+            snapshot.load_cached(path, "probe", build)
+        finally:
+            snapshot.SNAPSHOT_VERSION = version
+        assert len(calls) == 2
+        [current] = (path.parent / snapshot.SNAPSHOT_DIR_NAME).glob(f"{path.stem}.probe.*")
+        assert current.name.endswith(f"-v{version + 1}")
+
+
+def test_round_trip_keeps_dtypes():
+    frame = pd.DataFrame({
+        "count": pd.array([1, None, 3], dtype="Int64"),
+        "flag": pd.array([True, None, False], dtype="boolean"),
+        "ratio": pd.array([0.5, None, 1.5], dtype="Float64"),
+        "plain": np.array([True, False, True]),
+        "day": np.array([1, 366, 0], dtype=np.int16),
+        "season": pd.Categorical(["Winter", "Summer", "Winter"], categories=["Unknown", "Winter", "Summer"]),
+        "label": ["Hungary", np.nan, "Israel"],
+    })
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot.write_snapshot(frame, Path(directory) / "frame")
+        loaded = snapshot.read_snapshot(Path(directory) / "frame")
+        pd.testing.assert_frame_equal(loaded, frame)
+        # The unused "Unknown" category survives, so category codes line up with the original
+        assert loaded["season"].cat.categories.tolist() == ["Unknown", "Winter", "Summer"]
+
+
+def main():
+    for test in (test_edited_csv_replaces_stale_snapshot, test_version_bump_forces_rebuild,
+                 test_round_trip_keeps_dtypes):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the chunked CSV counts
+
+Checks that `count_csv`, with chunks much smaller than the table, gives the
+same overlap counts and season/hemisphere tables as the in-memory path, on
+the real CSV and on a synthetic one. Runs as a script or under pytest.
+"""
+import tempfile
+
+from analysis import EmpiricalOverlaps
+from dataset import DEFAULT_PATH, HolidayDataset
+from streaming import count_csv
+from visualization import Choropleth
+
+
+def _check_against_memory(path, chunksize):
+    dataset = HolidayDataset.from_csv(path, use_snapshot=False)
+    streamed = count_csv(path, chunksize=chunksize)
+    assert streamed.rows == len(dataset), path
+    assert streamed.overlap_counts() == EmpiricalOverlaps(dataset=dataset, streaming=False).count_overlaps(), path
+
+    # The in-memory tables are keyed by categories, the streamed ones by plain strings
+    choropleth = Choropleth(dataset=dataset)
+    hemisphere_counts, hemisphere_season = choropleth.get_hemisphere_stats(verbose=False)
+    assert streamed.season_counts().to_dict() == choropleth.get_season_stats(verbose=False).to_dict(), path
+    assert streamed.hemisphere_counts().to_dict() == hemisphere_counts.to_dict(), path
+    assert streamed.hemisphere_season().to_dict() == hemisphere_season.to_dict(), path
+
+
+def test_real_csv_in_small_chunks():
+    _check_against_memory(DEFAULT_PATH, chunksize=7)
+
+
+def test_synthetic_csv_in_small_chunks():
+    from benchmarks.synthetic import synthetic_csv
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A chunk size that doesn't divide the row count leaves a short last chunk
+        _check_against_memory(synthetic_csv(5_000, seed=1, directory=directory), chunksize=333)
+
+
+def main():
+    for test in (test_real_csv_in_small_chunks, test_synthetic_csv_in_small_chunks):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
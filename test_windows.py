@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the near-overlap window sums
+
+Checks `circular_window_sums` against a brute-force sum of rolled copies of
+the occupancy vector, including holidays on 31 December and 1 January whose
+windows wrap round the year end, and that `window_histogram` accounts for
+every day once per half-width. Runs as a script or under pytest.
+"""
+import numpy as np
+
+from dates import DAYS_IN_YEAR
+from windows import circular_window_sums, window_histogram
+
+WINDOWS = [0, 1, 2, 3, 7, 30, 182, 183, 200]
+
+
+def _brute_force(occupancy, d):
+    """Holidays within ±d days of each day, by summing the vector shifted by every offset"""
+    if 2 * d + 1 >= len(occupancy):
+        return np.full(len(occupancy), occupancy.sum())
+    return sum(np.roll(occupancy, shift) for shift in range(-d, d + 1))
+
+
+def _occupancies():
+    rng = np.random.default_rng(0)
+    wrap = np.zeros(DAYS_IN_YEAR, dtype=np.int64)
+    wrap[[0, DAYS_IN_YEAR - 1]] = [2, 3]          # 1 January and day 366
+    yield wrap
+    yield rng.poisson(0.55, DAYS_IN_YEAR)
+    yield np.zeros(DAYS_IN_YEAR, dtype=np.int64)
+
+
+def test_window_sums_match_brute_force():
+    for occupancy in _occupancies():
+        sums = circular_window_sums(occupancy, WINDOWS)
+        assert sums.shape == (len(WINDOWS), DAYS_IN_YEAR)
+        for row, d in zip(sums, WINDOWS):
+            assert np.array_equal(row, _brute_force(occupancy, d)), d
+
+
+def test_windows_wrap_round_the_year_end():
+    occupancy = next(_occupancies())
+    [one_day] = circular_window_sums(occupancy, [1])
+    # 1 January sees day 366, day 366 sees 1 January, 30 December sees only day 366
+    assert one_day[0] == 5 and one_day[-1] == 5
+    assert one_day[1] == 2 and one_day[-2] == 3
+    assert one_day[2:-2].sum() == 0
+
+
+def test_histogram_counts_every_day():
+    for occupancy in _occupancies():
+        histogram = window_histogram(occupancy, WINDOWS)
+        assert histogram.columns.tolist() == WINDOWS
+        assert (histogram.sum(axis=0) == DAYS_IN_YEAR).all()
+        # Weighting by k counts each holiday once per day of its window
+        weighted = histogram.mul(histogram.index, axis=0).sum(axis=0)
+        expected = [occupancy.sum() * min(2 * d + 1, DAYS_IN_YEAR) for d in WINDOWS]
+        assert weighted.tolist() == expected
+
+
+def main():
+    for test in (test_window_sums_match_brute_force, test_windows_wrap_round_the_year_end,
+                 test_histogram_counts_every_day):
+        test()
+        print(f"✓ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
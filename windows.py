@@ -0,0 +1,65 @@
+"""
+Near-overlaps: how many holidays fall within ±d days of each other.
+
+The engine works on the occupancy vector, the number of holidays on each of
+the 366 days of the (leap-year) calendar. For a window half-width d, the
+window sum at day t is the number of holidays in [t - d, t + d], taken
+circularly so late-December windows pick up early-January holidays. Window
+sums for any number of half-widths come from one cumulative sum over the
+vector padded with its own wrap-around, so a sweep over windows is a single
+gather. d = 0 reduces to the exact same-day counts.
+"""
+import numpy as np
+import pandas as pd
+
+from dates import DAYS_IN_YEAR
+
+
+def _as_windows(windows) -> np.ndarray:
+    windows = np.atleast_1d(np.asarray(windows, dtype=np.int64))
+    if (windows < 0).any():
+        raise ValueError("window half-widths must be non-negative")
+    return windows
+
+
+def circular_window_sums(occupancy, windows) -> np.ndarray:
+    """
+    Holidays within ±d days of each day, shape (len(windows), len(occupancy)).
+
+    Windows of 2d + 1 days or more cover the whole year.
+    """
+    occupancy = np.asarray(occupancy, dtype=np.int64)
+    windows = _as_windows(windows)
+    slots = len(occupancy)
+    # Half-widths beyond half the year all cover every day
+    reach = np.minimum(windows, slots // 2)
+    pad = int(reach.max())
+    padded = np.concatenate([occupancy[slots - pad:], occupancy, occupancy[:pad]])
+    cumulative = np.concatenate([[0], np.cumsum(padded)])
+
+    day = np.arange(slots)
+    sums = cumulative[day + pad + reach[:, None] + 1] - cumulative[day + pad - reach[:, None]]
+    sums[2 * windows + 1 >= slots] = occupancy.sum()
+    return sums
+
+
+def window_histogram(occupancy, windows) -> pd.DataFrame:
+    """
+    Number of days whose ±d window holds exactly k holidays.
+
+    Indexed by k (0 up to the largest window sum, no cap), one column per
+    half-width d.
+    """
+    windows = _as_windows(windows)
+    sums = circular_window_sums(occupancy, windows)
+    sizes = int(sums.max()) + 1
+    # Offset each window's sums into its own block so one bincount covers the sweep
+    offsets = np.arange(len(windows))[:, None] * sizes
+    histogram = np.bincount((sums + offsets).ravel(), minlength=len(windows) * sizes).reshape(len(windows), sizes)
+    return pd.DataFrame(histogram.T, index=pd.Index(np.arange(sizes), name='k'),
+                        columns=pd.Index(windows, name='window'))
+
+
+def window_probabilities(windows, days: int = DAYS_IN_YEAR) -> np.ndarray:
+    """Chance that a uniformly random day falls in a given ±d window"""
+    return np.minimum((2 * _as_windows(windows) + 1) / days, 1.0)